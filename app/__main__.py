@@ -0,0 +1,135 @@
+"""
+Comandos de operación de la app.
+
+    python -m app migrate [--revision head]
+    python -m app serve [--host 0.0.0.0] [--port 8000] [--workers 4]
+    python -m app grant-role USERNAME ROLE [--revoke]
+
+`migrate` aplica las migraciones de alembic y termina. Con varios procesos
+se corre una vez antes de arrancarlos y se desactiva la migración del
+lifespan con DB_MIGRATE_ON_STARTUP=false.
+
+`serve` migra una vez y arranca un worker de uvicorn por núcleo (ver
+app.server); usa uvloop y httptools si están instalados. Con algún backend
+"memory" (revocación, rate limit o cache de lectura) arranca un solo worker y
+rechaza --workers mayor a 1: ese estado no se comparte entre procesos.
+
+`grant-role` asigna uno de los roles que crea la migración 0004_default_roles
+(admin, editor, author) a un usuario; los scopes de escritura salen de ahí.
+El usuario tiene que volver a iniciar sesión: los roles viajan en el token.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def migrate(args) -> int:
+    from app.db.core import dispose_engines
+    from app.db.migrate import upgrade_db
+
+    upgrade_db(args.revision)
+    asyncio.run(dispose_engines())
+    return 0
+
+
+def grant_role(args) -> int:
+    from app.db.core import dispose_engines, init_engines, session_local
+    from app.models.user_model import set_db_user_role
+
+    init_engines()
+    with session_local() as session:
+        try:
+            db_user = set_db_user_role(
+                args.username, args.role, session, granted=not args.revoke
+            )
+        except FileNotFoundError as e:
+            sys.exit(str(e))
+        roles = ", ".join(sorted(role.slug for role in db_user.roles)) or "-"
+    asyncio.run(dispose_engines())
+    print(f"{args.username}: {roles}")
+    return 0
+
+
+def serve(args) -> int:
+    import uvicorn
+
+    from app.routers.tokens.env_settings import settings
+    from app.server import Supervisor, default_workers, process_local_backends
+
+    requested = args.workers or settings.SERVER_WORKERS
+    local_backends = process_local_backends(settings)
+    if local_backends and requested > 1:
+        sys.exit(
+            f"--workers {requested} requires shared backends; "
+            f"{', '.join(local_backends)} set to 'memory' (per process)"
+        )
+    workers = 1 if local_backends else requested or default_workers()
+    migrate_on_startup = settings.DB_MIGRATE_ON_STARTUP
+    if migrate_on_startup:
+        migrate(argparse.Namespace(revision="head"))
+    # Los workers leen la configuración del entorno al arrancar: ya no migran,
+    # y cada uno usa su parte de los núcleos para su pool de hashing
+    os.environ["DB_MIGRATE_ON_STARTUP"] = "false"
+    os.environ.setdefault(
+        "HASHER_MAX_WORKERS", str(max(1, default_workers() // workers))
+    )
+    # main.py está en la raíz del proyecto; los workers heredan sys.path
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    config = uvicorn.Config(
+        "main:app",
+        host=args.host or settings.SERVER_HOST,
+        port=args.port or settings.SERVER_PORT,
+        loop="auto",
+        http="auto",
+        lifespan="on",
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    )
+    # Después de uvicorn.Config, que configura el logging
+    if local_backends and not requested and default_workers() > 1:
+        logger.warning(
+            "Running 1 worker: %s set to 'memory' (per process)",
+            ", ".join(local_backends),
+        )
+    return Supervisor(
+        config,
+        workers,
+        settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        migrate_on_reload=migrate_on_startup,
+    ).run()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="apply database migrations")
+    migrate_parser.add_argument("--revision", default="head")
+    migrate_parser.set_defaults(handler=migrate)
+
+    # Sin valor se usan SERVER_HOST, SERVER_PORT y SERVER_WORKERS de settings
+    serve_parser = commands.add_parser("serve", help="run the multi-worker server")
+    serve_parser.add_argument("--host")
+    serve_parser.add_argument("--port", type=int)
+    serve_parser.add_argument("--workers", type=int, help="default: one per core with shared backends, else 1")
+    serve_parser.set_defaults(handler=serve)
+
+    grant_parser = commands.add_parser("grant-role", help="assign a role to a user")
+    grant_parser.add_argument("username")
+    grant_parser.add_argument("role", help="admin, editor, author or another roles.slug")
+    grant_parser.add_argument("--revoke", action="store_true", help="remove the role instead")
+    grant_parser.set_defaults(handler=grant_role)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
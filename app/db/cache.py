@@ -0,0 +1,148 @@
+import hashlib
+import importlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.routers.tokens.env_settings import settings
+
+
+@dataclass(frozen=True)
+class CachedEntity:
+    body: bytes
+    etag: str
+
+
+class MemoryCacheBackend:
+    """
+    LRU acotado con TTL, por proceso. Un backend compartido (Redis, memcached)
+    solo necesita `get`, `set` y `delete` con los mismos argumentos.
+    """
+
+    def __init__(self, max_size: int = settings.READ_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class ReadThroughCache:
+    """
+    Guarda la respuesta ya serializada de una fila, así un hit no consulta la
+    base de datos ni vuelve a serializar. El ETag es el sha256 del cuerpo, por
+    lo que cambia solo si cambia el contenido.
+
+    Una carga que empezó antes de una escritura puede terminar después de su
+    `invalidate` con el cuerpo viejo: por cada llave con cargas en curso se
+    cuenta cuántas invalidaciones hubo, y la carga no guarda (o borra lo que
+    guardó) si ese número cambió. Solo ve las invalidaciones de este proceso.
+    """
+
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # llave -> [cargas en curso, invalidaciones desde que hay cargas]
+        self._loading: dict[str, list[int]] = {}
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def get_or_load(self, key: str, loader) -> CachedEntity:
+        body = self.backend.get(key)
+        if body is None:
+            with self._lock:
+                loading = self._loading.setdefault(key, [0, 0])
+                loading[0] += 1
+                generation = loading[1]
+            try:
+                model: BaseModel = loader()
+                body = json.dumps(
+                    model.model_dump(mode="json"), separators=(",", ":")
+                ).encode()
+                if loading[1] == generation:
+                    self.backend.set(key, body, self.ttl)
+                    # Una invalidación entre la revisión y el set ya borró
+                    if loading[1] != generation:
+                        self.backend.delete(key)
+            finally:
+                with self._lock:
+                    loading[0] -= 1
+                    if loading[0] == 0:
+                        del self._loading[key]
+        return CachedEntity(body=body, etag=self._etag(body))
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if key in self._loading:
+                self._loading[key][1] += 1
+        self.backend.delete(key)
+
+
+def load_backend(path: str):
+    if path == "memory":
+        return MemoryCacheBackend()
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+read_cache = ReadThroughCache(
+    backend=load_backend(settings.READ_CACHE_BACKEND),
+    ttl=settings.READ_CACHE_TTL_SECONDS,
+)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match usa comparación débil: se ignora el prefijo W/
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in (
+        value[2:] if value.startswith("W/") else value for value in candidates
+    )
+
+
+def cached_response(request: Request, entity: CachedEntity) -> Response:
+    headers = {
+        "ETag": entity.etag,
+        "Cache-Control": f"public, max-age={settings.READ_CACHE_MAX_AGE}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), entity.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=entity.body, media_type="application/json", headers=headers
+    )
@@ -3,16 +3,43 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     String,
+    Engine,
     create_engine,
+    event,
+    make_url,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from datetime import datetime
+from app.routers.metrics import instrumentation
+from app.routers.tokens.env_settings import settings
+
+
+DATABASE_URL = settings.DATABASE_URL
 
 
-DATABASE_URL = "sqlite:///./test.db"
+def to_async_url(url: str) -> str:
+    """
+    Traduce una URL síncrona al driver async equivalente:
+    sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg.
+    Las URLs que ya indican un driver se dejan igual.
+    """
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme:
+        return url
+    drivers = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+    return drivers.get(scheme, scheme) + sep + rest
+
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
 
 
 class Base(DeclarativeBase):
@@ -25,8 +52,8 @@ class NotFoundError(Exception):
 
 class TimeStampedModel(Base):
     __abstract__ = True
-    created_at = mapped_column(DateTime(timezone=True), default=datetime.now())
-    updated_at = mapped_column(DateTime(timezone=True), onupdate=datetime.now())
+    created_at = mapped_column(DateTime(timezone=True), default=datetime.now)
+    updated_at = mapped_column(DateTime(timezone=True), onupdate=datetime.now)
 
 
 """
@@ -39,7 +66,7 @@ class DBUser(TimeStampedModel):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
-    username: Mapped[str] = mapped_column(nullable=False)
+    username: Mapped[str] = mapped_column(nullable=False, unique=True, index=True)
     full_name: Mapped[str] = mapped_column(nullable=False)
     email: Mapped[str] = mapped_column(nullable=False, unique=True)
     hashed_password: Mapped[str] = mapped_column(nullable=False)
@@ -112,7 +139,9 @@ class DBCategory(Base):
     __tablename__ = "categories"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
-    name: Mapped[str] = mapped_column(String(80), nullable=False)
+    name: Mapped[str] = mapped_column(
+        String(80), nullable=False, unique=True, index=True
+    )
     slug: Mapped[str] = mapped_column(String(80), nullable=False, unique=True)
 
     """
@@ -132,7 +161,9 @@ class DBPost(TimeStampedModel):
     __tablename__ = "posts"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
-    name: Mapped[str] = mapped_column(String(80), nullable=False)
+    name: Mapped[str] = mapped_column(
+        String(80), nullable=False, unique=True, index=True
+    )
     slug: Mapped[str] = mapped_column(String(80), nullable=False, unique=True)
     description: Mapped[str]
 
@@ -140,7 +171,7 @@ class DBPost(TimeStampedModel):
     Relación muchos a uno con la tabla DBUser. Una publicación pertenece a un solo usuario (autor).
     """
     author_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
     author: Mapped["DBUser"] = relationship(back_populates="created_posts")
 
@@ -148,7 +179,7 @@ class DBPost(TimeStampedModel):
     Relación muchos a uno con la tabla DBCategory. Una publicación pertenece a una sola categoría.
     """
     category_id: Mapped[int] = mapped_column(
-        ForeignKey("categories.id", ondelete="CASCADE"), nullable=False
+        ForeignKey("categories.id", ondelete="CASCADE"), nullable=False, index=True
     )
     category: Mapped["DBCategory"] = relationship(back_populates="posts")
 
@@ -173,8 +204,9 @@ class DBPostTag(Base):
     post_id: Mapped[int] = mapped_column(
         ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True
     )
+    # La llave primaria (post_id, tag_id) no sirve para buscar por tag_id
     tag_id: Mapped[int] = mapped_column(
-        ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
+        ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True, index=True
     )
 
 
@@ -188,7 +220,9 @@ class DBTag(TimeStampedModel):
     __tablename__ = "tags"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
-    name: Mapped[str] = mapped_column(String(80), nullable=False)
+    name: Mapped[str] = mapped_column(
+        String(80), nullable=False, unique=True, index=True
+    )
     slug: Mapped[str] = mapped_column(String(80), nullable=False, unique=True)
 
     """
@@ -200,9 +234,99 @@ class DBTag(TimeStampedModel):
     )
 
 
-engine = create_engine(DATABASE_URL)
-session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base.metadata.create_all(bind=engine)
+def engine_options(url: str) -> dict:
+    """
+    Opciones del pool tomadas de Settings. SQLite en memoria usa un pool de
+    una sola conexión que no acepta estos argumentos, así que se omiten.
+    """
+    db_url = make_url(url)
+    if db_url.get_backend_name() == "sqlite" and db_url.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return {}
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    # aiosqlite usa NullPool por defecto; se fuerza un pool real para que las
+    # conexiones (y sus PRAGMA) se reutilicen.
+    if db_url.get_driver_name() == "aiosqlite":
+        options["poolclass"] = AsyncAdaptedQueuePool
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS:d}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE:d}")
+    cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE:d}")
+    cursor.close()
+
+
+# Los engines se crean en `init_engines` (lifespan de la app o comando de
+# migración), no al importar: importar el módulo no abre la base de datos.
+# Los sessionmaker existen desde ya para que se puedan importar, y se enlazan
+# al engine cuando este se crea.
+engine: Engine | None = None
+async_engine: AsyncEngine | None = None
+session_local = sessionmaker(autocommit=False, autoflush=False)
+async_session_local = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def init_engines() -> Engine:
+    """Crea los engines (una sola vez por proceso) y devuelve el síncrono."""
+    global engine, async_engine
+    if engine is not None:
+        return engine
+
+    engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL)
+    )
+    session_local.configure(bind=engine)
+    async_session_local.configure(bind=async_engine)
+
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
+    if settings.METRICS_ENABLED or settings.SLOW_QUERY_MS > 0:
+        # Consultas y tiempo de base de datos del request en curso, y el log de
+        # consultas lentas
+        for bind in (engine, async_engine.sync_engine):
+            event.listen(
+                bind, "before_cursor_execute", instrumentation.before_cursor_execute
+            )
+            event.listen(
+                bind, "after_cursor_execute", instrumentation.after_cursor_execute
+            )
+    return engine
+
+
+async def dispose_engines() -> None:
+    """Cierra las conexiones de ambos pools; los engines siguen utilizables."""
+    if engine is not None:
+        await async_engine.dispose()
+        engine.dispose()
+
+
+def dialect_insert(session):
+    """
+    Devuelve el `insert` del dialecto activo, que es el que soporta
+    ON CONFLICT (on_conflict_do_update / on_conflict_do_nothing).
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
 
 
 def get_db():
@@ -211,3 +335,8 @@ def get_db():
         yield database
     finally:
         database.close()
+
+
+async def get_async_db():
+    async with async_session_local() as database:
+        yield database
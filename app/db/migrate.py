@@ -0,0 +1,43 @@
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import inspect
+
+from app.db.core import DATABASE_URL, init_engines
+
+# alembic se importa dentro de las funciones: solo lo necesita el paso de
+# migración y cuesta más que el resto de la capa de datos al importar
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+
+BASELINE_REVISION = "0001_initial"
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def alembic_config(url: str = DATABASE_URL) -> "Config":
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(Path(__file__).parent / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def upgrade_db(revision: str = "head", bind=None) -> None:
+    """
+    Aplica las migraciones pendientes (por defecto sobre el engine de la app).
+    Las bases creadas antes con `Base.metadata.create_all` no tienen tabla
+    `alembic_version`; en ese caso se marcan primero con la revisión inicial
+    para no recrear las tablas.
+    """
+    from alembic import command
+
+    bind = bind if bind is not None else init_engines()
+    config = alembic_config(bind.url.render_as_string(hide_password=False))
+    with bind.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "users" in tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
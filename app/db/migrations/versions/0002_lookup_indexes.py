@@ -0,0 +1,49 @@
+"""indexes on hot lookup columns
+
+Revision ID: 0002_lookup_indexes
+Revises: 0001_initial
+Create Date: 2024-05-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_lookup_indexes"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+DUPLICATED_USERNAMES = (
+    "SELECT username FROM users GROUP BY username HAVING COUNT(*) > 1"
+)
+
+
+def upgrade() -> None:
+    # El índice único falla con usernames repetidos (antes no eran únicos):
+    # se avisa cuáles son para resolverlos a mano antes de migrar
+    duplicated = op.get_bind().scalars(sa.text(DUPLICATED_USERNAMES)).all()
+    if duplicated:
+        raise RuntimeError(
+            "Duplicate usernames must be renamed or removed before this "
+            f"migration: {', '.join(duplicated)}"
+        )
+    # get_user filtra por username en cada request autenticado
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    # Unicidad de nombres (antes la revisaban los validadores con un SELECT)
+    op.create_index("ix_posts_name", "posts", ["name"], unique=True)
+    op.create_index("ix_tags_name", "tags", ["name"], unique=True)
+    op.create_index("ix_categories_name", "categories", ["name"], unique=True)
+    # Búsquedas inversas: posts por autor, por categoría y por etiqueta
+    op.create_index("ix_posts_author_id", "posts", ["author_id"])
+    op.create_index("ix_posts_category_id", "posts", ["category_id"])
+    op.create_index("ix_posts_tags_tag_id", "posts_tags", ["tag_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_tags_tag_id", table_name="posts_tags")
+    op.drop_index("ix_posts_category_id", table_name="posts")
+    op.drop_index("ix_posts_author_id", table_name="posts")
+    op.drop_index("ix_categories_name", table_name="categories")
+    op.drop_index("ix_tags_name", table_name="tags")
+    op.drop_index("ix_posts_name", table_name="posts")
+    op.drop_index("ix_users_username", table_name="users")
@@ -0,0 +1,85 @@
+"""full-text search over posts.name and posts.description
+
+Revision ID: 0003_posts_search
+Revises: 0002_lookup_indexes
+Create Date: 2024-05-20 00:00:00
+"""
+from alembic import op
+
+
+revision = "0003_posts_search"
+down_revision = "0002_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    # Tabla FTS5 de contenido externo: el texto vive en posts, el índice aquí
+    """
+    CREATE VIRTUAL TABLE posts_fts USING fts5(
+        name, description,
+        content='posts', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_au AFTER UPDATE OF name, description ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO posts_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS posts_fts_au",
+    "DROP TRIGGER IF EXISTS posts_fts_ad",
+    "DROP TRIGGER IF EXISTS posts_fts_ai",
+    "DROP TABLE IF EXISTS posts_fts",
+]
+
+POSTGRESQL_UPGRADE = [
+    # Columna generada: Postgres la mantiene al día sin triggers
+    """
+    ALTER TABLE posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ix_posts_search_vector ON posts USING gin (search_vector)",
+]
+
+POSTGRESQL_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_posts_search_vector",
+    "ALTER TABLE posts DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    statements = POSTGRESQL_UPGRADE if dialect == "postgresql" else SQLITE_UPGRADE
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    statements = (
+        POSTGRESQL_DOWNGRADE if dialect == "postgresql" else SQLITE_DOWNGRADE
+    )
+    for statement in statements:
+        op.execute(statement)
@@ -0,0 +1,57 @@
+"""default roles for the write scopes
+
+Revision ID: 0004_default_roles
+Revises: 0003_posts_search
+Create Date: 2024-06-01 00:00:00
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_default_roles"
+down_revision = "0003_posts_search"
+branch_labels = None
+depends_on = None
+
+
+# Slugs de DEFAULT_ROLE_SCOPES (app.routers.tokens.scopes); sin estos roles
+# nadie tiene scopes de escritura. Se copian para que la migración no cambie
+# si el mapa cambia después.
+DEFAULT_ROLES = [
+    {"name": "Admin", "slug": "admin"},
+    {"name": "Editor", "slug": "editor"},
+    {"name": "Author", "slug": "author"},
+]
+
+roles = sa.table(
+    "roles",
+    sa.column("id", sa.Integer),
+    sa.column("name", sa.String),
+    sa.column("slug", sa.String),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("updated_at", sa.DateTime(timezone=True)),
+)
+
+
+def upgrade() -> None:
+    # Solo los que falten: una base existente puede tener alguno ya creado a mano
+    existing = set(op.get_bind().scalars(sa.select(roles.c.slug)))
+    now = datetime.now(timezone.utc)
+    missing = [
+        {**role, "created_at": now, "updated_at": now}
+        for role in DEFAULT_ROLES
+        if role["slug"] not in existing
+    ]
+    if missing:
+        op.bulk_insert(roles, missing)
+
+
+def downgrade() -> None:
+    slugs = [role["slug"] for role in DEFAULT_ROLES]
+    # Sin depender de ON DELETE CASCADE (SQLite lo ignora sin PRAGMA foreign_keys)
+    users_roles = sa.table("users_roles", sa.column("role_id", sa.Integer))
+    role_ids = sa.select(roles.c.id).where(roles.c.slug.in_(slugs))
+    op.execute(users_roles.delete().where(users_roles.c.role_id.in_(role_ids)))
+    op.execute(roles.delete().where(roles.c.slug.in_(slugs)))
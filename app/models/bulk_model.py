@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import Literal, Optional
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db.core import dialect_insert
+
+
+BULK_CHUNK_SIZE = 500
+MAX_BULK_ITEMS = 5000
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "updated", "duplicate", "error"]
+    id: Optional[int] = None
+    slug: Optional[str] = None
+    detail: Optional[str] = None
+
+
+def chunked(items: list, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _upsert_stmt(session: Session, model, rows: list[dict], update_columns, where):
+    insert = dialect_insert(session)
+    stmt = insert(model).values(rows)
+    set_ = {column: stmt.excluded[column] for column in update_columns}
+    if hasattr(model, "updated_at"):
+        set_["updated_at"] = datetime.now()
+    where_clause = where(stmt.excluded) if where is not None else None
+    return stmt.on_conflict_do_update(
+        index_elements=["slug"], set_=set_, where=where_clause
+    ).returning(model.id, model.slug)
+
+
+def bulk_upsert_by_slug(
+    session: Session,
+    model,
+    rows: list[dict],
+    update_columns: list[str],
+    after_chunk=None,
+    conflict_where=None,
+) -> list[BulkItemResult]:
+    """
+    Inserta o actualiza `rows` (ON CONFLICT sobre `slug`) con un INSERT por
+    bloque y un commit por bloque. Si un bloque falla por integridad (p. ej.
+    un nombre repetido con otro slug) se reintenta fila por fila para poder
+    reportar el error de cada elemento.
+
+    `after_chunk(chunk, ids_by_slug)` corre dentro de la misma transacción del
+    bloque, antes del commit. `conflict_where(excluded)` restringe qué filas
+    existentes se pueden actualizar; las que no cumplen se reportan como error.
+    """
+    results: list[Optional[BulkItemResult]] = [None] * len(rows)
+    first_index: dict[str, int] = {}
+    unique = []
+    for index, row in enumerate(rows):
+        if row["slug"] in first_index:
+            results[index] = BulkItemResult(
+                index=index, status="duplicate", slug=row["slug"]
+            )
+        else:
+            first_index[row["slug"]] = index
+            unique.append((index, row))
+
+    for chunk in chunked(unique):
+        slugs = [row["slug"] for _, row in chunk]
+        existing = set(
+            session.scalars(select(model.slug).where(model.slug.in_(slugs)))
+        )
+        try:
+            ids_by_slug = _execute_upsert(
+                session, model, chunk, update_columns, conflict_where
+            )
+            if after_chunk is not None:
+                after_chunk(chunk, ids_by_slug)
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            ids_by_slug = {}
+            for item in chunk:
+                try:
+                    ids_by_slug.update(
+                        _execute_upsert(
+                            session, model, [item], update_columns, conflict_where
+                        )
+                    )
+                    if after_chunk is not None:
+                        after_chunk([item], ids_by_slug)
+                    session.commit()
+                except IntegrityError as e:
+                    session.rollback()
+                    ids_by_slug.pop(item[1]["slug"], None)
+                    results[item[0]] = BulkItemResult(
+                        index=item[0],
+                        status="error",
+                        slug=item[1]["slug"],
+                        detail=str(e.orig),
+                    )
+        for index, row in chunk:
+            if results[index] is not None:
+                continue
+            if row["slug"] not in ids_by_slug:
+                results[index] = BulkItemResult(
+                    index=index,
+                    status="error",
+                    slug=row["slug"],
+                    detail="Slug already in use and cannot be updated",
+                )
+                continue
+            results[index] = BulkItemResult(
+                index=index,
+                status="updated" if row["slug"] in existing else "created",
+                id=ids_by_slug[row["slug"]],
+                slug=row["slug"],
+            )
+
+    for result in results:
+        if result.status == "duplicate":
+            result.id = results[first_index[result.slug]].id
+    return results
+
+
+def _execute_upsert(session: Session, model, chunk, update_columns, where) -> dict:
+    rows = [row for _, row in chunk]
+    stmt = _upsert_stmt(session, model, rows, update_columns, where)
+    return {slug: id for id, slug in session.execute(stmt)}
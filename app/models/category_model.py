@@ -1,8 +1,14 @@
 from typing import Optional
 from fastapi import Depends, HTTPException
-from pydantic import BaseModel, field_validator
-from slugify import slugify
-from app.db.core import DBCategory, DBPost, NotFoundError, get_db, session_local
+from pydantic import BaseModel
+from app.models.slug import slugify
+from app.db.core import DBCategory, DBPost, NotFoundError, get_db
+from app.db.cache import CachedEntity, read_cache
+from app.models.page_model import DEFAULT_PAGE_SIZE, keyset_page
+from app.models.bulk_model import BulkItemResult, bulk_upsert_by_slug
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import re
 
@@ -12,13 +18,7 @@ class CategoryBase(BaseModel):
 
 
 class CategoryCreate(CategoryBase):
-    @field_validator("name")
-    def name_must_be_unique(cls, v, values):
-        db = session_local()
-        post_with_same_name = db.query(DBCategory).filter(DBCategory.name == v).first()
-        if post_with_same_name:
-            raise ValueError("Name must be unique")
-        return v
+    pass
 
 
 class CategoryUpdate(CategoryBase):
@@ -33,6 +33,10 @@ class Category(CategoryBase):
         from_attributes = True
 
 
+def name_conflict() -> HTTPException:
+    return HTTPException(status_code=409, detail="Name must be unique")
+
+
 def get_category_from_id(category_id: int, db: Session = Depends(get_db)) -> DBCategory:
     category = db.query(DBCategory).filter(DBCategory.id == category_id).first()
     if not category:
@@ -56,8 +60,43 @@ def read_db_category(category_id: int, session: Session) -> DBCategory:
     return db_category
 
 
-def read_db_posts_for_category(category_id: int, session: Session) -> list[DBPost]:
-    return session.query(DBPost).filter(DBPost.category_id == category_id).all()
+def read_cached_category(category_id: int, session: Session) -> CachedEntity:
+    return read_cache.get_or_load(
+        f"category:{category_id}",
+        lambda: Category.model_validate(read_db_category(category_id, session)),
+    )
+
+
+def read_db_categories(
+    session: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[int] = None,
+    name: Optional[str] = None,
+) -> tuple[list[DBCategory], Optional[int]]:
+    query = session.query(DBCategory)
+    if name:
+        query = query.filter(DBCategory.name.startswith(name))
+    return keyset_page(query, DBCategory.id, limit, cursor)
+
+
+def read_db_posts_for_category(
+    category_id: int,
+    session: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[int] = None,
+) -> tuple[list[DBPost], Optional[int]]:
+    read_db_category(category_id, session)
+    query = session.query(DBPost).filter(DBPost.category_id == category_id)
+    return keyset_page(query, DBPost.id, limit, cursor)
+
+
+async def aread_db_category(category_id: int, session: AsyncSession) -> DBCategory:
+    db_category = await session.scalar(
+        select(DBCategory).where(DBCategory.id == category_id)
+    )
+    if not db_category:
+        raise NotFoundError(f"category with id {category_id} not found.")
+    return db_category
 
 
 def create_db_category(category: CategoryCreate, session: Session) -> DBCategory:
@@ -69,18 +108,59 @@ def create_db_category(category: CategoryCreate, session: Session) -> DBCategory
         session.commit()
         session.refresh(db_category)
         return db_category
+    except IntegrityError as e:
+        session.rollback()
+        raise name_conflict() from e
     except Exception as e:
         session.rollback()
         raise e
 
 
+async def acreate_db_category(
+    category: CategoryCreate, session: AsyncSession
+) -> DBCategory:
+    try:
+        slug = slugify(category.name)
+        db_category = DBCategory(**category.model_dump(exclude_none=True))
+        db_category.slug = slug
+        session.add(db_category)
+        await session.commit()
+        await session.refresh(db_category)
+        return db_category
+    except IntegrityError as e:
+        await session.rollback()
+        raise name_conflict() from e
+    except Exception as e:
+        await session.rollback()
+        raise e
+
+
+def bulk_upsert_db_categories(
+    categories: list[CategoryCreate], session: Session
+) -> list[BulkItemResult]:
+    rows = [
+        {"name": category.name, "slug": slugify(category.name)}
+        for category in categories
+    ]
+    results = bulk_upsert_by_slug(session, DBCategory, rows, update_columns=["name"])
+    for result in results:
+        if result.status == "updated":
+            read_cache.invalidate(f"category:{result.id}")
+    return results
+
+
 def update_db_category(
     category_id: int, category: CategoryUpdate, session: Session
 ) -> DBCategory:
     db_category = read_db_category(category_id, session)
     for key, value in category.model_dump(exclude_none=True).items():
         setattr(db_category, key, value)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        raise name_conflict() from e
+    read_cache.invalidate(f"category:{category_id}")
     session.refresh(db_category)
 
     # get the posts
@@ -94,4 +174,5 @@ def delete_db_category(category_id: int, session: Session) -> DBCategory:
     db_category = read_db_category(category_id, session)
     session.delete(db_category)
     session.commit()
+    read_cache.invalidate(f"category:{category_id}")
     return db_category
@@ -0,0 +1,56 @@
+from typing import Generic, List, Optional, TypeVar
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Query
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[int] = None
+
+
+class PageResponse(Response):
+    """
+    Respuesta JSON de los listados y de las rutas de un solo ítem, serializada
+    con orjson. El endpoint la devuelve ya armada, así FastAPI no vuelve a
+    validar el contenido contra el response_model (que se declara solo para la
+    documentación).
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return orjson.dumps(content.model_dump())
+
+
+def page_response(item_model, rows, next_cursor: Optional[int]) -> PageResponse:
+    # Una sola validación (from_attributes) de toda la página en pydantic-core
+    page = Page[item_model].model_validate(
+        {"items": rows, "next_cursor": next_cursor}, from_attributes=True
+    )
+    return PageResponse(page)
+
+
+def item_response(item_model, row) -> PageResponse:
+    return PageResponse(item_model.model_validate(row, from_attributes=True))
+
+
+def keyset_page(query: Query, id_column, limit: int, cursor: Optional[int] = None):
+    """
+    Paginación por llave (keyset): en lugar de OFFSET se filtra por `id > cursor`,
+    así el costo de cada página no crece con la profundidad. Se pide una fila de
+    más para saber si existe una página siguiente.
+    """
+    limit = min(limit, MAX_PAGE_SIZE)
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
@@ -1,40 +1,73 @@
+import csv
+import html
+import io
+import re
 from datetime import datetime
-from sqlite3 import IntegrityError
 
+import orjson
 from fastapi import HTTPException
 from pydantic import BaseModel, field_validator
 from typing import List, Optional
-from slugify import slugify
-from sqlalchemy.orm import Session
-from app.db.core import DBPost, NotFoundError, session_local
+from sqlalchemy import column, func, insert, literal_column, select, table
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.db.core import (
+    DBCategory,
+    DBPost,
+    DBPostTag,
+    DBTag,
+    DBUser,
+    NotFoundError,
+    dialect_insert,
+    session_local,
+)
 from app.models.category_model import Category, read_db_category
 from app.models.tag_model import Tag, read_db_tag
+from app.models.page_model import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+from app.models.bulk_model import BulkItemResult, bulk_upsert_by_slug
+from app.models.slug import slugify
+
+# La base marca las coincidencias con caracteres de uso privado, no con HTML:
+# el texto es contenido de usuarios y se escapa antes de poner los <mark>
+SEARCH_SENTINELS = ("\ue000", "\ue001")
+SEARCH_MARK = ("<mark>", "</mark>")
+
+
+def strip_search_sentinels(text: str | None) -> str | None:
+    """Quita los marcadores del texto de usuario: si no, se vuelven <mark>."""
+    if text is None:
+        return None
+    for sentinel in SEARCH_SENTINELS:
+        text = text.replace(sentinel, "")
+    return text
 
 
 class PostBase(BaseModel):
     name: str
     description: str
 
+    _strip_sentinels = field_validator("name", "description")(strip_search_sentinels)
 
-class PostCreate(PostBase):
 
-    @field_validator("name")
-    def title_must_be_unique(cls, v, values):
-        db = session_local()
-        post_with_same_name = db.query(DBPost).filter(DBPost.name == v).first()
-        if post_with_same_name:
-            raise ValueError("Name must be unique")
-        return v
+class PostCreate(PostBase):
+    pass
 
 
 class PostCreateWithTags(PostCreate):
     tags: Optional[List[int]] = None
 
 
+class PostBulkItem(PostCreateWithTags):
+    category_id: int
+
+
 class PostUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
 
+    _strip_sentinels = field_validator("name", "description")(strip_search_sentinels)
+
 
 class Post(PostBase):
     id: int
@@ -48,31 +81,297 @@ class Post(PostBase):
         from_attributes = True
 
 
-def read_db_post(post_id: int, session: Session) -> DBPost:
-    db_post = session.query(DBPost).filter(DBPost.id == post_id).first()
+class PostSearchResult(Post):
+    rank: float
+    # Fragmentos con las coincidencias entre <mark>; el resto del texto va
+    # escapado como HTML (ver mark_matches), a diferencia de name y description
+    name_highlight: str
+    description_snippet: str
+
+
+class AuthorSummary(BaseModel):
+    id: int
+    username: str
+    full_name: str | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class PostDetail(Post):
+    author: AuthorSummary
+    category: Category
+    tags: List[Tag] = []
+
+
+"""
+Opciones de carga para PostDetail. author y category son muchos a uno, así que
+se resuelven con un JOIN en la misma consulta; tags es muchos a muchos y se
+carga con un único SELECT ... IN por página. Una página cuesta dos consultas
+sin importar cuántas filas tenga.
+"""
+POST_DETAIL_OPTIONS = (
+    joinedload(DBPost.author),
+    joinedload(DBPost.category),
+    selectinload(DBPost.tags),
+)
+
+
+def read_db_post(post_id: int, session: Session, options=()) -> DBPost:
+    db_post = (
+        session.query(DBPost).options(*options).filter(DBPost.id == post_id).first()
+    )
+    if db_post is None:
+        raise NotFoundError(f"Post with id {post_id} not found.")
+    return db_post
+
+
+def read_db_posts(
+    session: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[int] = None,
+    author_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    tag_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    options=(),
+) -> tuple[list[DBPost], Optional[int]]:
+    query = session.query(DBPost).options(*options)
+    if author_id is not None:
+        query = query.filter(DBPost.author_id == author_id)
+    if category_id is not None:
+        query = query.filter(DBPost.category_id == category_id)
+    if tag_id is not None:
+        query = query.join(DBPostTag, DBPostTag.post_id == DBPost.id).filter(
+            DBPostTag.tag_id == tag_id
+        )
+    if created_after is not None:
+        query = query.filter(DBPost.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(DBPost.created_at < created_before)
+    return keyset_page(query, DBPost.id, limit, cursor)
+
+
+async def aread_db_post(post_id: int, session: AsyncSession) -> DBPost:
+    db_post = await session.scalar(select(DBPost).where(DBPost.id == post_id))
     if db_post is None:
         raise NotFoundError(f"Post with id {post_id} not found.")
     return db_post
 
 
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = (
+    "id",
+    "slug",
+    "name",
+    "description",
+    "author",
+    "category",
+    "tags",
+    "created_at",
+    "updated_at",
+)
+
+
+def export_posts_query(session: Session):
+    """
+    Una fila por post con el username del autor, el slug de la categoría y los
+    slugs de sus etiquetas (subconsulta correlacionada sobre posts_tags), así
+    no hace falta cargar entidades ni relaciones.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        tag_slugs = func.string_agg(DBTag.slug, ",")
+    else:
+        tag_slugs = func.group_concat(DBTag.slug, ",")
+    tags = (
+        select(tag_slugs)
+        .join(DBPostTag, DBPostTag.tag_id == DBTag.id)
+        .where(DBPostTag.post_id == DBPost.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            DBPost.id,
+            DBPost.slug,
+            DBPost.name,
+            DBPost.description,
+            DBUser.username,
+            DBCategory.slug,
+            tags,
+            DBPost.created_at,
+            DBPost.updated_at,
+        )
+        .join(DBUser, DBUser.id == DBPost.author_id)
+        .join(DBCategory, DBCategory.id == DBPost.category_id)
+        .order_by(DBPost.id)
+    )
+
+
+def stream_db_posts_export(
+    export_format: str = "ndjson", batch_size: int = EXPORT_BATCH_SIZE
+):
+    """
+    Genera el export por bloques de `batch_size` filas leídas con un cursor del
+    lado del servidor (yield_per), así la memoria no depende del tamaño de la
+    tabla. Abre su propia sesión porque corre mientras se envía la respuesta,
+    cuando la de la dependencia get_db ya se cerró.
+    """
+    with session_local() as session:
+        result = session.execute(
+            export_posts_query(session).execution_options(yield_per=batch_size)
+        )
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield b"".join(
+                    orjson.dumps(
+                        {
+                            **dict(zip(EXPORT_COLUMNS, row)),
+                            "tags": row[6].split(",") if row[6] else [],
+                        }
+                    )
+                    + b"\n"
+                    for row in rows
+                )
+
+
+def mark_matches(text: str | None) -> str | None:
+    if text is None:
+        return None
+    start, stop = SEARCH_SENTINELS
+    return (
+        html.escape(text).replace(start, SEARCH_MARK[0]).replace(stop, SEARCH_MARK[1])
+    )
+
+
+posts_fts = table("posts_fts", column("rowid"))
+
+
+def fts_match_expression(q: str) -> str | None:
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura: cada palabra
+    va entre comillas (sin operadores) y la última admite prefijo, para
+    búsquedas mientras se escribe.
+    """
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+def search_db_posts(
+    session: Session,
+    q: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    tag_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+) -> list[PostSearchResult]:
+    """
+    Búsqueda de texto completo sobre name y description, ordenada por
+    relevancia (las coincidencias en name pesan más). En SQLite usa la tabla
+    FTS5 posts_fts y en Postgres la columna posts.search_vector, ambas creadas
+    en la migración 0003_posts_search.
+    """
+    start, stop = SEARCH_SENTINELS
+    if session.get_bind().dialect.name == "postgresql":
+        search_vector = literal_column("posts.search_vector")
+        tsquery = func.websearch_to_tsquery("simple", q)
+        rank = func.ts_rank_cd(search_vector, tsquery).label("score")
+        marks = f'StartSel="{start}", StopSel="{stop}"'
+        query = select(
+            DBPost,
+            rank,
+            func.ts_headline(
+                "simple", DBPost.name, tsquery, f"{marks}, HighlightAll=true"
+            ).label("name_highlight"),
+            func.ts_headline("simple", DBPost.description, tsquery, marks).label(
+                "description_snippet"
+            ),
+        ).where(search_vector.op("@@")(tsquery))
+    else:
+        match = fts_match_expression(q)
+        if match is None:
+            return []
+        fts = literal_column("posts_fts")
+        # bm25 devuelve valores negativos: más bajo es más relevante
+        rank = (-func.bm25(fts, 10.0, 1.0)).label("score")
+        query = (
+            select(
+                DBPost,
+                rank,
+                func.highlight(fts, 0, start, stop).label("name_highlight"),
+                func.snippet(fts, 1, start, stop, "…", 16).label("description_snippet"),
+            )
+            .join(posts_fts, posts_fts.c.rowid == DBPost.id)
+            .where(fts.op("MATCH")(match))
+        )
+    if category_id is not None:
+        query = query.where(DBPost.category_id == category_id)
+    if tag_id is not None:
+        query = query.join(DBPostTag, DBPostTag.post_id == DBPost.id).where(
+            DBPostTag.tag_id == tag_id
+        )
+    query = query.order_by(rank.desc(), DBPost.id).limit(min(limit, MAX_PAGE_SIZE))
+    return [
+        PostSearchResult(
+            **Post.model_validate(db_post).model_dump(),
+            rank=score,
+            name_highlight=mark_matches(name_highlight),
+            description_snippet=mark_matches(description_snippet),
+        )
+        for db_post, score, name_highlight, description_snippet in session.execute(
+            query
+        )
+    ]
+
+
+def missing_tags_error(tag_ids: list[int], found: set[int]) -> HTTPException | None:
+    missing = [tag_id for tag_id in tag_ids if tag_id not in found]
+    if not missing:
+        return None
+    return HTTPException(status_code=404, detail=f"Tags not found: {missing}")
+
+
 def create_db_post(
-    current_user, category: Category, post: PostCreate, session: Session
+    current_user, category: Category, post: PostCreateWithTags, session: Session
 ) -> DBPost:
+    # Todas las etiquetas se resuelven con un solo SELECT ... IN
+    tag_ids = list(dict.fromkeys(getattr(post, "tags", None) or []))
+    if tag_ids:
+        found = set(session.scalars(select(DBTag.id).where(DBTag.id.in_(tag_ids))))
+        error = missing_tags_error(tag_ids, found)
+        if error:
+            raise error
     slug = slugify(post.name)
-    db_post = DBPost(**post.model_dump())
+    db_post = DBPost(**post.model_dump(exclude={"tags"}))
     db_post.slug = slug
-    db_post.author = current_user
-    db_post.category = category
+    db_post.author_id = current_user.id
+    db_post.category_id = category.id
     try:
         session.add(db_post)
+        if tag_ids:
+            session.flush()
+            session.execute(
+                insert(DBPostTag),
+                [{"post_id": db_post.id, "tag_id": tag_id} for tag_id in tag_ids],
+            )
         session.commit()
         session.refresh(db_post)
     except IntegrityError as e:
         session.rollback()
-        # Manejar error de integridad, por ejemplo, una clave duplicada
-        raise HTTPException(
-            status_code=400, detail="Error de integridad: {}".format(str(e))
-        )
+        # Nombre o slug duplicado: la unicidad la garantiza la base de datos
+        raise HTTPException(status_code=409, detail="Name must be unique") from e
     except Exception as e:
         # Manejar otros errores generales
         session.rollback()
@@ -81,11 +380,111 @@ def create_db_post(
     return db_post
 
 
+async def acreate_db_post(
+    current_user, category: Category, post: PostCreateWithTags, session: AsyncSession
+) -> DBPost:
+    tag_ids = list(dict.fromkeys(getattr(post, "tags", None) or []))
+    if tag_ids:
+        found = set(
+            await session.scalars(select(DBTag.id).where(DBTag.id.in_(tag_ids)))
+        )
+        error = missing_tags_error(tag_ids, found)
+        if error:
+            raise error
+    slug = slugify(post.name)
+    db_post = DBPost(**post.model_dump(exclude={"tags"}))
+    db_post.slug = slug
+    db_post.author_id = current_user.id
+    db_post.category_id = category.id
+    try:
+        session.add(db_post)
+        if tag_ids:
+            await session.flush()
+            await session.execute(
+                insert(DBPostTag),
+                [{"post_id": db_post.id, "tag_id": tag_id} for tag_id in tag_ids],
+            )
+        await session.commit()
+        await session.refresh(db_post)
+    except IntegrityError as e:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="Name must be unique") from e
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail="Error al crear el post")
+
+    return db_post
+
+
+def bulk_upsert_db_posts(
+    current_user, posts: list[PostBulkItem], session: Session
+) -> list[BulkItemResult]:
+    category_ids = {post.category_id for post in posts}
+    tag_ids = {tag_id for post in posts for tag_id in post.tags or []}
+    known_categories = set(
+        session.scalars(select(DBCategory.id).where(DBCategory.id.in_(category_ids)))
+    )
+    known_tags = set(session.scalars(select(DBTag.id).where(DBTag.id.in_(tag_ids))))
+
+    results: list[BulkItemResult | None] = [None] * len(posts)
+    valid_indexes, rows, tags_by_slug = [], [], {}
+    for index, post in enumerate(posts):
+        missing_tags = sorted(set(post.tags or []) - known_tags)
+        if post.category_id not in known_categories:
+            detail = f"Category with id {post.category_id} not found"
+        elif missing_tags:
+            detail = f"Tags not found: {missing_tags}"
+        else:
+            slug = slugify(post.name)
+            valid_indexes.append(index)
+            rows.append(
+                {
+                    "name": post.name,
+                    "slug": slug,
+                    "description": post.description,
+                    "category_id": post.category_id,
+                    "author_id": current_user.id,
+                }
+            )
+            tags_by_slug.setdefault(slug, post.tags or [])
+            continue
+        results[index] = BulkItemResult(index=index, status="error", detail=detail)
+
+    def attach_tags(chunk, ids_by_slug):
+        links = [
+            {"post_id": ids_by_slug[row["slug"]], "tag_id": tag_id}
+            for _, row in chunk
+            if row["slug"] in ids_by_slug
+            for tag_id in tags_by_slug[row["slug"]]
+        ]
+        if links:
+            insert = dialect_insert(session)
+            session.execute(insert(DBPostTag).on_conflict_do_nothing(), links)
+
+    upserted = bulk_upsert_by_slug(
+        session,
+        DBPost,
+        rows,
+        update_columns=["name", "description", "category_id"],
+        after_chunk=attach_tags,
+        # Solo se actualizan los posts del mismo autor
+        conflict_where=lambda excluded: DBPost.author_id == excluded.author_id,
+    )
+    for index, result in zip(valid_indexes, upserted):
+        result.index = index
+        results[index] = result
+    return results
+
+
 def update_db_post(post_id: int, post: PostUpdate, session: Session) -> DBPost:
     db_post = read_db_post(post_id, session)
     for key, value in post.model_dump(exclude_none=True).items():
         setattr(db_post, key, value)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Name must be unique") from e
     session.refresh(db_post)
     return db_post
 
@@ -0,0 +1,6 @@
+def slugify(text: str) -> str:
+    # python-slugify compila sus expresiones y tablas al importarse; se carga
+    # con el primer slug y no al arrancar
+    from slugify import slugify as _slugify
+
+    return _slugify(text)
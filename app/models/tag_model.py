@@ -1,8 +1,14 @@
 from typing import Optional
 from fastapi import Depends, HTTPException
-from pydantic import BaseModel, field_validator
-from slugify import slugify
-from app.db.core import DBTag, DBPost, NotFoundError, get_db, session_local
+from pydantic import BaseModel
+from app.models.slug import slugify
+from app.db.core import DBTag, DBPost, DBPostTag, NotFoundError, get_db
+from app.db.cache import CachedEntity, read_cache
+from app.models.page_model import DEFAULT_PAGE_SIZE, keyset_page
+from app.models.bulk_model import BulkItemResult, bulk_upsert_by_slug
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import re
 
@@ -12,13 +18,7 @@ class TagBase(BaseModel):
 
 
 class TagCreate(TagBase):
-    @field_validator("name")
-    def name_must_be_unique(cls, v, values):
-        db = session_local()
-        post_with_same_name = db.query(DBTag).filter(DBTag.name == v).first()
-        if post_with_same_name:
-            raise ValueError("Name must be unique")
-        return v
+    pass
 
 
 class TagUpdate(TagBase):
@@ -33,6 +33,10 @@ class Tag(TagBase):
         from_attributes = True
 
 
+def name_conflict() -> HTTPException:
+    return HTTPException(status_code=409, detail="Name must be unique")
+
+
 def get_tag_from_id(tag_id: int, db: Session = Depends(get_db)) -> DBTag:
     tag = db.query(DBTag).filter(DBTag.id == tag_id).first()
     if not tag:
@@ -56,8 +60,45 @@ def read_db_tag(tag_id: int, session: Session) -> DBTag:
     return db_tag
 
 
-def read_db_posts_for_tag(tag_id: int, session: Session) -> list[DBPost]:
-    return session.query(DBPost).filter(DBPost.tag_id == tag_id).all()
+def read_cached_tag(tag_id: int, session: Session) -> CachedEntity:
+    return read_cache.get_or_load(
+        f"tag:{tag_id}",
+        lambda: Tag.model_validate(read_db_tag(tag_id, session)),
+    )
+
+
+def read_db_tags(
+    session: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[int] = None,
+    name: Optional[str] = None,
+) -> tuple[list[DBTag], Optional[int]]:
+    query = session.query(DBTag)
+    if name:
+        query = query.filter(DBTag.name.startswith(name))
+    return keyset_page(query, DBTag.id, limit, cursor)
+
+
+def read_db_posts_for_tag(
+    tag_id: int,
+    session: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[int] = None,
+) -> tuple[list[DBPost], Optional[int]]:
+    read_db_tag(tag_id, session)
+    query = (
+        session.query(DBPost)
+        .join(DBPostTag, DBPostTag.post_id == DBPost.id)
+        .filter(DBPostTag.tag_id == tag_id)
+    )
+    return keyset_page(query, DBPost.id, limit, cursor)
+
+
+async def aread_db_tag(tag_id: int, session: AsyncSession) -> DBTag:
+    db_tag = await session.scalar(select(DBTag).where(DBTag.id == tag_id))
+    if not db_tag:
+        raise NotFoundError(f"tag with id {tag_id} not found.")
+    return db_tag
 
 
 def create_db_tag(tag: TagCreate, session: Session) -> DBTag:
@@ -69,16 +110,52 @@ def create_db_tag(tag: TagCreate, session: Session) -> DBTag:
         session.commit()
         session.refresh(db_tag)
         return db_tag
+    except IntegrityError as e:
+        session.rollback()
+        raise name_conflict() from e
     except Exception as e:
         session.rollback()
         raise e
 
 
+async def acreate_db_tag(tag: TagCreate, session: AsyncSession) -> DBTag:
+    try:
+        slug = slugify(tag.name)
+        db_tag = DBTag(**tag.model_dump(exclude_none=True))
+        db_tag.slug = slug
+        session.add(db_tag)
+        await session.commit()
+        await session.refresh(db_tag)
+        return db_tag
+    except IntegrityError as e:
+        await session.rollback()
+        raise name_conflict() from e
+    except Exception as e:
+        await session.rollback()
+        raise e
+
+
+def bulk_upsert_db_tags(
+    tags: list[TagCreate], session: Session
+) -> list[BulkItemResult]:
+    rows = [{"name": tag.name, "slug": slugify(tag.name)} for tag in tags]
+    results = bulk_upsert_by_slug(session, DBTag, rows, update_columns=["name"])
+    for result in results:
+        if result.status == "updated":
+            read_cache.invalidate(f"tag:{result.id}")
+    return results
+
+
 def update_db_tag(tag_id: int, tag: TagUpdate, session: Session) -> DBTag:
     db_tag = read_db_tag(tag_id, session)
     for key, value in tag.model_dump(exclude_none=True).items():
         setattr(db_tag, key, value)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        raise name_conflict() from e
+    read_cache.invalidate(f"tag:{tag_id}")
     session.refresh(db_tag)
 
     # get the posts
@@ -92,4 +169,5 @@ def delete_db_tag(tag_id: int, session: Session) -> DBTag:
     db_tag = read_db_tag(tag_id, session)
     session.delete(db_tag)
     session.commit()
+    read_cache.invalidate(f"tag:{tag_id}")
     return db_tag
@@ -1,16 +1,28 @@
+import asyncio
+import logging
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose.exceptions import JWTError
 from pydantic import BaseModel
-from app.db.core import DBUser, get_db
-from sqlalchemy.orm import Session
+from app.db.core import DBUser, async_session_local, get_async_db
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.routers.metrics.instrumentation import timed_operation
 from app.routers.tokens.hasher import Hasher
 from app.models.user_model import User
 from app.routers.tokens.env_settings import settings
+from app.routers.tokens.token_cache import token_cache
+from app.routers.tokens.keys import keyring
+from app.routers.tokens.revocation import RefreshRecord, revocation_store
+from app.routers.tokens.scopes import permission_map
+from app.routers.tokens.user_state import disabled_users
 
 
+logger = logging.getLogger(__name__)
+
 # to get a string like this run:
 # openssl rand -hex 32
 SECRET_KEY = settings.SECRET_KEY
@@ -20,13 +32,30 @@ ALGORITHM = settings.ALGORITHM
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
 
 
 class TokenData(BaseModel):
     username: str | None = None
 
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+class Principal(BaseModel):
+    id: int
+    username: str
+    is_disabled: bool = False
+    roles: list[str] = []
+
+
+oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="token",
+    scopes={
+        "users:read": "Read users",
+        "users:write": "Create and modify users",
+        "posts:write": "Create and modify posts",
+        "tags:write": "Create and modify tags",
+        "categories:write": "Create and modify categories",
+    },
+)
 
 
 def get_user(db, username: str):
@@ -34,46 +63,137 @@ def get_user(db, username: str):
     return user
 
 
-def authenticate_user(db, username: str, password: str):
-    user = get_user(db, username)
+async def aget_user(db: AsyncSession, username: str):
+    return await db.scalar(select(DBUser).where(DBUser.username == username))
+
+
+# Referencias a las tareas en curso para que no las recolecte el GC
+_rehash_tasks: set[asyncio.Task] = set()
+
+
+async def rehash_password(user_id: int, password: str) -> None:
+    try:
+        hashed_password = await Hasher.aget_password_hash(password)
+        async with async_session_local() as session:
+            await session.execute(
+                update(DBUser)
+                .where(DBUser.id == user_id)
+                .values(hashed_password=hashed_password)
+            )
+            await session.commit()
+    except Exception:
+        logger.exception("Could not rehash password for user %s", user_id)
+
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await aget_user(db, username)
     # print(user.username)
     if not user:
+        return await Hasher.averify_dummy(password)
+    if not await Hasher.averify_password(password, user.hashed_password):
         return False
-    if not Hasher.verify_password(password, user.hashed_password):
-        return False
+    if Hasher.needs_update(user.hashed_password):
+        # El hash nuevo se calcula fuera del request para no duplicar la
+        # latencia del login.
+        task = asyncio.create_task(rehash_password(user.id, password))
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
     return user
 
 
+def encode_token(claims: dict) -> str:
+    # jose.jwt arrastra cryptography al importarse; se carga con el primer token
+    from jose import jwt
+
+    kid, key = keyring.signing_key()
+    headers = {"kid": kid} if kid else None
+    with timed_operation("jwt.encode"):
+        return jwt.encode(claims, key, algorithm=ALGORITHM, headers=headers)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    encoded_jwt = encode_token(to_encode)
     return encoded_jwt
 
 
-async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-):
-    credentials_exception = HTTPException(
+def create_refresh_token(
+    username: str, family: str | None = None, scopes: list[str] | None = None
+) -> str:
+    """
+    Refresh token de un solo uso. Todos los tokens que salen de una misma
+    sesión comparten `fam`; si uno ya usado vuelve a presentarse se revoca la
+    familia completa. `scopes` guarda el alcance reducido de la sesión para
+    que un refresh no lo amplíe.
+    """
+    family = family or uuid.uuid4().hex
+    jti = uuid.uuid4().hex
+    expire = datetime.now(timezone.utc) + timedelta(
+        days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+    )
+    revocation_store.backend.store_refresh(
+        jti, RefreshRecord(username, family, expire.timestamp(), scopes=scopes)
+    )
+    return encode_token(
+        {"sub": username, "typ": "refresh", "fam": family, "jti": jti, "exp": expire}
+    )
+
+
+def decode_token(token: str) -> dict:
+    from jose import jwt
+
+    with timed_operation("jwt.decode"):
+        key = keyring.verification_key(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise JWTError("Unknown signing key")
+        return jwt.decode(token, key, algorithms=[ALGORITHM])
+
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
-        raise credentials_exception
-    user = get_user(db, username=token_data.username)
-    if user is None:
-        raise credentials_exception
+
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    cached = token_cache.get(token)
+    if cached is not None:
+        payload = cached.claims
+    else:
+        try:
+            payload = decode_token(token)
+        except JWTError:
+            raise credentials_exception()
+        if payload.get("sub") is None or payload.get("typ") == "refresh":
+            raise credentials_exception()
+    if revocation_store.is_access_revoked(payload.get("jti")):
+        raise credentials_exception()
+    return payload
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme),
+    payload: dict = Depends(get_token_claims),
+):
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached.user
+    token_data = TokenData(username=payload["sub"])
+    db_user = await aget_user(db, username=token_data.username)
+    if db_user is None:
+        raise credentials_exception()
+    # Se cachea una copia desacoplada de la sesión para poder compartirla
+    # entre requests sin volver a consultar la base de datos.
+    user = User.model_validate(db_user)
+    token_cache.put(token, payload, user)
     return user
 
 
@@ -83,3 +203,52 @@ async def get_current_active_user(
     if current_user.is_disabled:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+async def get_token_principal(
+    payload: Annotated[dict, Depends(get_token_claims)],
+) -> Principal:
+    """
+    Alternativa sin base de datos a get_current_user: el usuario se arma con
+    los claims firmados (sub, uid, disabled, roles). Tokens emitidos antes de
+    que existiera `uid` se rechazan y el cliente debe volver a autenticarse.
+    """
+    if payload.get("uid") is None:
+        raise credentials_exception()
+    return Principal(
+        id=payload["uid"],
+        username=payload["sub"],
+        is_disabled=payload.get("disabled", False),
+        roles=payload.get("roles", []),
+    )
+
+
+async def get_current_active_principal(
+    principal: Annotated[Principal, Depends(get_token_principal)],
+) -> Principal:
+    if principal.is_disabled or await disabled_users.is_disabled(principal.id):
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
+def require_scopes(*scopes: str):
+    """
+    Dependencia que exige `scopes` usando solo los claims del token. Vale lo
+    que el token declara en `scope` (puede ser un subconjunto pedido al
+    autenticarse) y que además sus roles siguen otorgando según el mapa de
+    permisos en memoria, así quitar un permiso a un rol afecta a los tokens ya
+    emitidos.
+    """
+
+    async def check_scopes(payload: dict = Depends(get_token_claims)) -> dict:
+        role_scopes = await permission_map.scopes_for(payload.get("roles", []))
+        granted = set(payload.get("scope", "").split()) & role_scopes
+        if not set(scopes) <= granted:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions",
+                headers={"WWW-Authenticate": f'Bearer scope="{" ".join(scopes)}"'},
+            )
+        return payload
+
+    return check_scopes
@@ -1,9 +1,13 @@
 from datetime import datetime
 from typing import Optional
+from fastapi import HTTPException
 from pydantic import BaseModel, EmailStr
-from app.db.core import DBUser
+from app.db.core import DBRole, DBUser, DBUserRole
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.routers.tokens.hasher import Hasher
+from app.routers.tokens.hasher import Hasher, hashing_pool
 
 
 class UserBase(BaseModel):
@@ -26,6 +30,11 @@ class User(UserBase):
         from_attributes = True
 
 
+def user_conflict() -> HTTPException:
+    # username (ix_users_username) y email son únicos
+    return HTTPException(status_code=409, detail="Username or email already registered")
+
+
 def read_db_user(user_id: int, session: Session) -> DBUser:
     db_user = session.query(DBUser).filter(DBUser.id == user_id).first()
     if db_user is None:
@@ -33,10 +42,63 @@ def read_db_user(user_id: int, session: Session) -> DBUser:
     return db_user
 
 
+async def aread_db_user(user_id: int, session: AsyncSession) -> DBUser:
+    db_user = await session.scalar(select(DBUser).where(DBUser.id == user_id))
+    if db_user is None:
+        raise FileNotFoundError(f"user with id {user_id} not found.")
+    return db_user
+
+
+async def aread_db_user_role_slugs(user_id: int, session: AsyncSession) -> list[str]:
+    slugs = await session.scalars(
+        select(DBRole.slug)
+        .join(DBUserRole, DBUserRole.role_id == DBRole.id)
+        .where(DBUserRole.user_id == user_id)
+    )
+    return list(slugs)
+
+
 def create_db_user(user: UserCreate, session: Session) -> DBUser:
     db_user = DBUser(**user.model_dump(exclude_none=True))
-    db_user.hashed_password = Hasher.get_password_hash(user.hashed_password)
+    db_user.hashed_password = hashing_pool.run_sync(
+        Hasher.get_password_hash, user.hashed_password
+    )
     session.add(db_user)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError as e:
+        session.rollback()
+        raise user_conflict() from e
     session.refresh(db_user)
     return db_user
+
+
+async def acreate_db_user(user: UserCreate, session: AsyncSession) -> DBUser:
+    db_user = DBUser(**user.model_dump(exclude_none=True))
+    db_user.hashed_password = await Hasher.aget_password_hash(user.hashed_password)
+    session.add(db_user)
+    try:
+        await session.commit()
+    except IntegrityError as e:
+        await session.rollback()
+        raise user_conflict() from e
+    await session.refresh(db_user)
+    return db_user
+
+
+def set_db_user_role(
+    username: str, role_slug: str, session: Session, granted: bool = True
+) -> DBUser:
+    """Asigna (o quita, con `granted=False`) el rol `role_slug` a un usuario."""
+    db_user = session.scalar(select(DBUser).where(DBUser.username == username))
+    if db_user is None:
+        raise FileNotFoundError(f"user {username} not found.")
+    db_role = session.scalar(select(DBRole).where(DBRole.slug == role_slug))
+    if db_role is None:
+        raise FileNotFoundError(f"role {role_slug} not found.")
+    if granted and db_role not in db_user.roles:
+        db_user.roles.append(db_role)
+    elif not granted and db_role in db_user.roles:
+        db_user.roles.remove(db_role)
+    session.commit()
+    return db_user
@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
+from app.db.cache import cached_response
 from app.db.core import NotFoundError, get_db
 from app.models.category_model import (
     Category,
     CategoryCreate,
     CategoryUpdate,
-    read_db_category,
+    read_cached_category,
+    read_db_categories,
     create_db_category,
     update_db_category,
     delete_db_category,
-    # read_db_posts_for_category,
+    bulk_upsert_db_categories,
+    read_db_posts_for_category,
 )
+from app.models.token_model import require_scopes
+from app.models.page_model import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Page,
+    PageResponse,
+    item_response,
+    page_response,
+)
+from app.models.bulk_model import MAX_BULK_ITEMS, BulkItemResult
 
 from app.models.post_model import Post
 
@@ -19,65 +33,98 @@ router = APIRouter(
     prefix="/categories",
 )
 
+# Las rutas de escritura exigen el scope en el token (ver require_scopes)
+write_access = [Depends(require_scopes("categories:write"))]
+
 
 # Rutas para usuarios
 
 
-@router.post("/")
+@router.post("/", response_model=Category, dependencies=write_access)
 def create_category(
     request: Request, category: CategoryCreate, db: Session = Depends(get_db)
-) -> Category:
+) -> PageResponse:
     db_category = create_db_category(category, db)
-    return Category(**db_category.__dict__)
+    return item_response(Category, db_category)
+
+
+@router.post("/bulk", dependencies=write_access)
+def bulk_create_categories(
+    request: Request, categories: list[CategoryCreate], db: Session = Depends(get_db)
+) -> list[BulkItemResult]:
+    if len(categories) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request"
+        )
+    return bulk_upsert_db_categories(categories, db)
+
+
+@router.get("/", response_model=Page[Category])
+def read_categories(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    name: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> PageResponse:
+    db_categories, next_cursor = read_db_categories(db, limit, cursor, name)
+    return page_response(Category, db_categories, next_cursor)
 
 
 @router.get("/{category_id}", response_model=Category)
 def read_category(
     request: Request, category_id: int, db: Session = Depends(get_db)
-) -> Category:
+) -> Response:
     try:
-        db_category = read_db_category(category_id, db)
+        cached_category = read_cached_category(category_id, db)
     except NotFoundError as e:
         raise HTTPException(status_code=400) from e
-    return Category(**db_category.__dict__)
+    return cached_response(request, cached_category)
 
 
-# @router.get("/{item_id}/posts")
-# def read_item_automations(
-#     request: Request, item_id: int, db: Session = Depends(get_db)
-# ) -> list[Post]:
-#     try:
-#         automations = read_db_posts_for_category(item_id, db)
-#     except NotFoundError as e:
-#         raise HTTPException(status_code=404) from e
-#     return [Post(**automation.__dict__) for automation in automations]
+@router.get("/{category_id}/posts", response_model=Page[Post])
+def read_category_posts(
+    request: Request,
+    category_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+) -> PageResponse:
+    try:
+        db_posts, next_cursor = read_db_posts_for_category(
+            category_id, db, limit, cursor
+        )
+    except NotFoundError as e:
+        raise HTTPException(status_code=404) from e
+    return page_response(Post, db_posts, next_cursor)
 
 
-@router.put("/{category_id}")
+@router.put("/{category_id}", response_model=Category, dependencies=write_access)
 def update_category(
     request: Request,
     category_id: int,
     category: CategoryUpdate,
     db: Session = Depends(get_db),
-) -> Category:
+) -> PageResponse:
     try:
         db_category = update_db_category(category_id, category, db)
     except NotFoundError as e:
         raise HTTPException(status_code=404) from e
-    return Category(**db_category.__dict__)
+    return item_response(Category, db_category)
 
 
-@router.delete("/{category_id}")
+@router.delete("/{category_id}", response_model=Category, dependencies=write_access)
 def delete_category(
     request: Request, category_id: int, db: Session = Depends(get_db)
-) -> Category:
+) -> PageResponse:
     try:
         db_category = delete_db_category(category_id, db)
     except NotFoundError as e:
         raise HTTPException(status_code=404) from e
-    return Category(**db_category.__dict__)
+    return item_response(Category, db_category)
 
 
+# from typing import Optional
 # from fastapi import APIRouter, Depends, HTTPException, Request
 # from sqlalchemy.orm import Session
 # from app.db.category import CategoryDB
@@ -0,0 +1,278 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from app.routers.tokens.env_settings import settings
+
+slow_query_logger = logging.getLogger("app.slow_queries")
+SLOW_QUERY_SECONDS = settings.SLOW_QUERY_MS / 1000
+
+# Límites superiores en segundos, al estilo de los histogramas de Prometheus
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [conteo por bucket..., suma, total]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            label_text = ",".join(
+                f'{name}="{value}"' for name, value in zip(self.label_names, labels)
+            )
+            cumulative = 0
+            for bucket, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bucket}"}} {cumulative}'
+                )
+            lines.append(
+                f'{self.name}_bucket{{{label_text},le="+Inf"}} {values[-1]}'
+            )
+            lines.append(f"{self.name}_sum{{{label_text}}} {values[-2]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {values[-1]}")
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route and status.",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+request_db_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS,
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per request.",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+operation_duration = Histogram(
+    "operation_duration_seconds",
+    "Password hashing and JWT operations.",
+    ("operation",),
+    LATENCY_BUCKETS,
+)
+HISTOGRAMS = (
+    request_duration,
+    request_db_queries,
+    request_db_duration,
+    operation_duration,
+)
+
+
+@dataclass
+class RequestStats:
+    scope: dict | None = None
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    hash_seconds: float = 0.0
+    jwt_seconds: float = 0.0
+
+
+# Se copia a los hilos del threadpool (endpoints síncronos) y del pool de
+# hashing, así todo lo que hace un request suma al mismo RequestStats.
+current_request: contextvars.ContextVar[RequestStats | None] = (
+    contextvars.ContextVar("current_request", default=None)
+)
+
+
+def record_query(seconds: float) -> None:
+    stats = current_request.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += seconds
+
+
+@contextmanager
+def timed_operation(operation: str):
+    """Mide una operación de hashing (`hash.*`) o de JWT (`jwt.*`)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        operation_duration.observe((operation,), elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            if operation.startswith("hash."):
+                stats.hash_seconds += elapsed
+            else:
+                stats.jwt_seconds += elapsed
+
+
+def route_label(scope: dict | None) -> str:
+    if scope is None:
+        return "-"
+    return f'{scope["method"]} {getattr(scope.get("route"), "path", "unmatched")}'
+
+
+def parameters_shape(parameters, executemany: bool = False) -> str:
+    """Tipos de los parámetros, sin sus valores (pueden ser datos sensibles)."""
+    if executemany:
+        if not parameters:
+            return "[]"
+        return f"{len(parameters)} x {parameters_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        fields = ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items())
+        return "{" + fields + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # En el contexto de ejecución y no en conn.info: si la consulta falla no
+    # corre after_cursor_execute, y el contexto se descarta con ella
+    start = time.perf_counter()
+    if context is not None:
+        context._query_start = start
+    else:
+        # Consultas internas del dialecto, sin contexto; se pisa, no se acumula
+        conn.info["query_start"] = start
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        start = getattr(context, "_query_start", None)
+    else:
+        start = conn.info.pop("query_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    record_query(elapsed)
+    if SLOW_QUERY_SECONDS and elapsed >= SLOW_QUERY_SECONDS:
+        stats = current_request.get()
+        slow_query_logger.warning(
+            "Slow query %.1fms [%s] %s params=%s",
+            elapsed * 1000,
+            route_label(stats.scope if stats else None),
+            " ".join(statement.split()),
+            parameters_shape(parameters, executemany),
+        )
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    return ", ".join(
+        [
+            f"app;dur={total_seconds * 1000:.2f}",
+            f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.db_queries} queries"',
+            f"hash;dur={stats.hash_seconds * 1000:.2f}",
+            f"jwt;dur={stats.jwt_seconds * 1000:.2f}",
+        ]
+    )
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI (no BaseHTTPMiddleware, para no sumar una tarea por
+    request) que registra latencia, consultas SQL y tiempo de base de datos
+    por ruta. La ruta es la plantilla (`/tags/{tag_id}`), no la URL, para
+    acotar la cardinalidad de las etiquetas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope=scope)
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        status = 500
+        add_timing = settings.SERVER_TIMING == "on" or (
+            settings.SERVER_TIMING == "header"
+            and (b"x-server-timing", b"1") in scope.get("headers", ())
+        )
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if add_timing:
+                    header = server_timing(stats, time.perf_counter() - start)
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (b"server-timing", header.encode()),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            method = scope["method"]
+            route_path = getattr(scope.get("route"), "path", "unmatched")
+            request_duration.observe(
+                (method, route_path, str(status)), time.perf_counter() - start
+            )
+            request_db_queries.observe((method, route_path), stats.db_queries)
+            request_db_duration.observe((method, route_path), stats.db_seconds)
+
+
+class RequestContextMiddleware:
+    """
+    Solo fija `current_request` para que el log de consultas lentas tenga la
+    ruta; se usa en lugar de MetricsMiddleware cuando las métricas están
+    desactivadas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_request.set(RequestStats(scope=scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+
+
+def render_metrics(gauges: dict[str, float]) -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for name, value in gauges.items():
+        lines.extend([f"# TYPE {name} gauge", f"{name} {value}"])
+    return "\n".join(lines) + "\n"
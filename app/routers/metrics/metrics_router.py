@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.db import core
+from app.routers.metrics.instrumentation import render_metrics
+from app.routers.tokens.hasher import hashing_pool
+from app.routers.tokens.token_cache import token_cache
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def read_metrics() -> PlainTextResponse:
+    gauges = {
+        f"hashing_pool_{name}": value for name, value in hashing_pool.stats().items()
+    }
+    gauges["token_cache_entries"] = len(token_cache)
+    binds = ()
+    if core.engine is not None:
+        binds = (("sync", core.engine), ("async", core.async_engine.sync_engine))
+    for name, bind in binds:
+        checkedout = getattr(bind.pool, "checkedout", None)
+        if checkedout is not None:
+            gauges[f"db_pool_{name}_checked_out"] = checkedout()
+    return PlainTextResponse(
+        render_metrics(gauges), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,122 @@
+import asyncio
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from app.routers.metrics.instrumentation import route_label
+from app.routers.tokens.env_settings import settings
+
+
+# Hojas de stack de hilos ociosos (event loop esperando, workers sin trabajo)
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class SamplingProfiler:
+    """
+    Perfilador por muestreo: un hilo toma el stack de todos los demás hilos
+    cada `interval` segundos. Cubre el event loop y los hilos del threadpool
+    donde corren los endpoints síncronos, cosa que cProfile (un solo hilo) no
+    hace. La salida es el formato "folded" (`frame;frame;frame cuenta`) que
+    leen flamegraph.pl, inferno y speedscope.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (Path(code.co_filename).name, code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({Path(code.co_filename).name}:"
+                        f"{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+
+def profile_path(scope: dict) -> Path:
+    label = re.sub(r"[^A-Za-z0-9]+", "-", route_label(scope)).strip("-")
+    return Path(settings.PROFILE_DIR) / f"{time.time_ns()}-{label}.folded"
+
+
+class ProfilingMiddleware:
+    """
+    Perfila un request si trae `X-Profile: 1` (con PROFILE_HEADER activo) o si
+    cae en la muestra de PROFILE_SAMPLE_RATE. El nombre del archivo generado
+    vuelve en el header X-Profile. Con requests concurrentes, sus stacks
+    también aparecen en el perfil.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def should_profile(self, scope) -> bool:
+        if settings.PROFILE_HEADER and (b"x-profile", b"1") in scope.get(
+            "headers", ()
+        ):
+            return True
+        return random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS / 1000)
+        path = None
+
+        async def send_wrapper(message):
+            nonlocal path
+            if message["type"] == "http.response.start":
+                path = profile_path(scope)
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-profile", path.name.encode()),
+                ]
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            path = path or profile_path(scope)
+            await asyncio.to_thread(write_profile, path, profiler.folded())
+
+
+def write_profile(path: Path, folded: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(folded)
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
 from fastapi.params import Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.models.category_model import (
     Category,
@@ -9,46 +12,150 @@ from app.models.category_model import (
 )
 from app.db.core import DBCategory, get_db, NotFoundError
 from app.models.post_model import (
+    POST_DETAIL_OPTIONS,
     Post,
+    PostBulkItem,
+    PostDetail,
+    PostSearchResult,
     PostCreate,
     PostCreateWithTags,
     PostUpdate,
+    bulk_upsert_db_posts,
     create_db_post,
     delete_db_post,
     read_db_post,
+    read_db_posts,
+    search_db_posts,
+    stream_db_posts_export,
     update_db_post,
 )
 
 
 from typing import Annotated, List
 
-from app.models.token_model import get_current_active_user
+from app.models.token_model import get_current_active_user, require_scopes
 from app.models.user_model import User
+from app.models.page_model import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Page,
+    PageResponse,
+    page_response,
+)
+from app.models.bulk_model import MAX_BULK_ITEMS, BulkItemResult
 
 router = APIRouter(
     prefix="/posts",
 )
 
+# Las rutas de escritura exigen el scope en el token (ver require_scopes)
+write_access = [Depends(require_scopes("posts:write"))]
+
 
 # Rutas para las posts
-@router.post("/")
+@router.post("/", dependencies=write_access)
 def create_post(
     current_user: Annotated[User, Depends(get_current_active_user)],
     category: Annotated[Category, Depends(get_category_from_id)],
-    post: PostCreate,
+    post: PostCreateWithTags,
     db: Session = Depends(get_db),
 ) -> Post:
     db_post = create_db_post(current_user, category, post, db)
-    return Post(**db_post.__dict__)
+    return Post.model_validate(db_post)
 
 
-# @router.get("/{post_id}")
-# def read_post(request: Request, post_id: int, db: Session = Depends(get_db)) -> Post:
-#     try:
-#         db_post = read_db_post(post_id, db)
-#     except NotFoundError as e:
-#         raise HTTPException(status_code=404) from e
-#     return Post(**db_post.__dict__)
+@router.post("/bulk", dependencies=write_access)
+def bulk_create_posts(
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    posts: list[PostBulkItem],
+    db: Session = Depends(get_db),
+) -> list[BulkItemResult]:
+    if len(posts) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request"
+        )
+    return bulk_upsert_db_posts(current_user, posts, db)
+
+
+@router.get("/", response_model=Page[Post])
+def read_posts(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    author_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    tag_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+) -> PageResponse:
+    db_posts, next_cursor = read_db_posts(
+        db,
+        limit,
+        cursor,
+        author_id=author_id,
+        category_id=category_id,
+        tag_id=tag_id,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    return page_response(Post, db_posts, next_cursor)
+
+
+@router.get("/details", response_model=Page[PostDetail])
+def read_posts_detail(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    author_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    tag_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+) -> PageResponse:
+    db_posts, next_cursor = read_db_posts(
+        db,
+        limit,
+        cursor,
+        author_id=author_id,
+        category_id=category_id,
+        tag_id=tag_id,
+        options=POST_DETAIL_OPTIONS,
+    )
+    return page_response(PostDetail, db_posts, next_cursor)
+
+
+@router.get("/search")
+def search_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    tag_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+) -> list[PostSearchResult]:
+    return search_db_posts(db, q, limit, tag_id=tag_id, category_id=category_id)
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/export")
+def export_posts(
+    format: Literal["ndjson", "csv"] = "ndjson",
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_db_posts_export(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="posts.{format}"'},
+    )
+
+
+@router.get("/{post_id}")
+def read_post(
+    request: Request, post_id: int, db: Session = Depends(get_db)
+) -> PostDetail:
+    try:
+        db_post = read_db_post(post_id, db, options=POST_DETAIL_OPTIONS)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404) from e
+    return PostDetail.model_validate(db_post)
 
 
 # @router.put("/{post_id}")
@@ -73,26 +180,6 @@ def create_post(
 #     return Post(**db_post.__dict__)
 
 
-# @router.post("/posts/", response_model=Post)
-# def create_post(
-#     post: PostCreate, tag_ids: List[int], db: Session = Depends(get_db)
-# ):
-#     db_post = Post(**post.model_dump())
-
-#     for tag_id in tag_ids:
-#         tag = db.query(TagDB).filter(TagDB.id == tag_id).first()
-#         if tag is None:
-#             raise HTTPException(
-#                 status_code=404, detail=f"Tag with id {tag_id} not found"
-#             )
-#         db_post.tags.append(tag)
-
-#     db.add(db_post)
-#     db.commit()
-#     db.refresh(db_post)
-#     return db_post
-
-
 # # Ruta para obtener los tags relacionados con un post
 # @router.get("/posts/{post_id}/tags/", response_model=List[Tag])
 # def get_tags_for_post(post_id: int, db: Session = Depends(get_db)):
@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
+from app.db.cache import cached_response
 from app.db.core import NotFoundError, get_db
 from app.models.tag_model import (
     Tag,
     TagCreate,
     TagUpdate,
-    read_db_tag,
+    read_cached_tag,
+    read_db_tags,
     create_db_tag,
     update_db_tag,
     delete_db_tag,
-    # read_db_posts_for_tag,
+    bulk_upsert_db_tags,
+    read_db_posts_for_tag,
 )
+from app.models.token_model import require_scopes
+from app.models.page_model import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Page,
+    PageResponse,
+    item_response,
+    page_response,
+)
+from app.models.bulk_model import MAX_BULK_ITEMS, BulkItemResult
 
 from app.models.post_model import Post
 
@@ -19,59 +33,94 @@ router = APIRouter(
     prefix="/tags",
 )
 
+# Las rutas de escritura exigen el scope en el token (ver require_scopes)
+write_access = [Depends(require_scopes("tags:write"))]
+
 
 # Rutas para usuarios
 
 
-@router.post("/")
-def create_tag(request: Request, tag: TagCreate, db: Session = Depends(get_db)) -> Tag:
+@router.post("/", response_model=Tag, dependencies=write_access)
+def create_tag(
+    request: Request, tag: TagCreate, db: Session = Depends(get_db)
+) -> PageResponse:
     db_tag = create_db_tag(tag, db)
-    return Tag(**db_tag.__dict__)
+    return item_response(Tag, db_tag)
+
+
+@router.post("/bulk", dependencies=write_access)
+def bulk_create_tags(
+    request: Request, tags: list[TagCreate], db: Session = Depends(get_db)
+) -> list[BulkItemResult]:
+    if len(tags) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request"
+        )
+    return bulk_upsert_db_tags(tags, db)
+
+
+@router.get("/", response_model=Page[Tag])
+def read_tags(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    name: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> PageResponse:
+    db_tags, next_cursor = read_db_tags(db, limit, cursor, name)
+    return page_response(Tag, db_tags, next_cursor)
 
 
 @router.get("/{tag_id}", response_model=Tag)
-def read_tag(request: Request, tag_id: int, db: Session = Depends(get_db)) -> Tag:
+def read_tag(request: Request, tag_id: int, db: Session = Depends(get_db)) -> Response:
     try:
-        db_tag = read_db_tag(tag_id, db)
+        cached_tag = read_cached_tag(tag_id, db)
     except NotFoundError as e:
         raise HTTPException(status_code=400) from e
-    return Tag(**db_tag.__dict__)
+    return cached_response(request, cached_tag)
 
 
-# @router.get("/{item_id}/posts")
-# def read_item_automations(
-#     request: Request, item_id: int, db: Session = Depends(get_db)
-# ) -> list[Post]:
-#     try:
-#         automations = read_db_posts_for_tag(item_id, db)
-#     except NotFoundError as e:
-#         raise HTTPException(status_code=404) from e
-#     return [Post(**automation.__dict__) for automation in automations]
+@router.get("/{tag_id}/posts", response_model=Page[Post])
+def read_tag_posts(
+    request: Request,
+    tag_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+) -> PageResponse:
+    try:
+        db_posts, next_cursor = read_db_posts_for_tag(tag_id, db, limit, cursor)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404) from e
+    return page_response(Post, db_posts, next_cursor)
 
 
-@router.put("/{tag_id}")
+@router.put("/{tag_id}", response_model=Tag, dependencies=write_access)
 def update_tag(
     request: Request,
     tag_id: int,
     tag: TagUpdate,
     db: Session = Depends(get_db),
-) -> Tag:
+) -> PageResponse:
     try:
         db_tag = update_db_tag(tag_id, tag, db)
     except NotFoundError as e:
         raise HTTPException(status_code=404) from e
-    return Tag(**db_tag.__dict__)
+    return item_response(Tag, db_tag)
 
 
-@router.delete("/{tag_id}")
-def delete_tag(request: Request, tag_id: int, db: Session = Depends(get_db)) -> Tag:
+@router.delete("/{tag_id}", response_model=Tag, dependencies=write_access)
+def delete_tag(
+    request: Request, tag_id: int, db: Session = Depends(get_db)
+) -> PageResponse:
     try:
         db_tag = delete_db_tag(tag_id, db)
     except NotFoundError as e:
         raise HTTPException(status_code=404) from e
-    return Tag(**db_tag.__dict__)
+    return item_response(Tag, db_tag)
 
 
+# from typing import Optional
 # from fastapi import APIRouter, Depends, HTTPException, Request
 # from sqlalchemy.orm import Session
 # from app.db.tag import TagDB
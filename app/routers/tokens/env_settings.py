@@ -1,18 +1,113 @@
 from dotenv import load_dotenv
 import os
 from pathlib import Path
+from typing import Literal
 
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
-env_path = Path().cwd().parent.parent / ".env"
+
+# El .env vive en la raíz del proyecto, no depende del directorio de trabajo
+env_path = Path(
+    os.getenv("ENV_FILE", Path(__file__).resolve().parents[3] / ".env")
+)
 load_dotenv(dotenv_path=env_path)
 
 
-class Settings:
+class Settings(BaseModel):
+    """
+    Configuración tipada. Se lee del entorno una sola vez (ver `from_env`) y
+    pydantic convierte y valida cada valor, así un error de configuración
+    falla al arrancar con el nombre de la variable y no en el primer request.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
     PROJECT_NAME: str = "PROJECT-FAST-API"
     PROJECT_VERSION: str = "1.0"
-    ACCESS_TOKEN_EXPIRE_MINUTES: float = float(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
-    SECRET_KEY = os.getenv("SECRET_KEY")
-    ALGORITHM = os.getenv("ALGORITHM")
+    ACCESS_TOKEN_EXPIRE_MINUTES: float = Field(gt=0)
+    SECRET_KEY: str | None = None
+    ALGORITHM: str
+    # Requerido con algoritmos asimétricos (RS256, ES256, ...)
+    JWT_KEYS_DIR: str | None = None
+    JWT_KEYS_RELOAD_SECONDS: float = 60
+    JWKS_MAX_AGE: int = 300
+    REFRESH_TOKEN_EXPIRE_DAYS: float = 14
+    # "memory" o "paquete.modulo:Clase" para un backend compartido
+    REVOCATION_BACKEND: str = "memory"
+    REVOCATION_BLOOM_BITS: int = 1 << 20
+    REVOCATION_BLOOM_HASHES: int = 7
+    REVOCATION_SYNC_SECONDS: float = 5
+    # JSON {"rol": ["scope", ...]}; por defecto app.routers.tokens.scopes
+    ROLE_SCOPES: str | None = None
+    # "memory" (por proceso) o "modulo:Clase" con un método hit(limits, window)
+    RATE_LIMIT_BACKEND: str = "memory"
+    LOGIN_RATE_PER_USERNAME: int = 5
+    LOGIN_RATE_PER_IP: int = 20
+    LOGIN_RATE_WINDOW_SECONDS: float = 60
+    HASHER_MAX_WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    HASHER_MAX_PENDING: int = 64
+    # "bcrypt" o "argon2" (argon2id, requiere argon2-cffi)
+    PASSWORD_SCHEME: Literal["bcrypt", "argon2"] = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 2
+    # 0 desactiva la calibración al arrancar y se usan los costos de arriba
+    PASSWORD_HASH_TARGET_MS: float = 0
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: float = 60
+    # "memory" (por proceso) o "modulo:Clase" con get/set/delete
+    READ_CACHE_BACKEND: str = "memory"
+    READ_CACHE_MAX_SIZE: int = 10000
+    # Con un backend compartido y varios procesos, una lectura que termina
+    # después de la invalidación hecha por otro proceso puede dejar el valor
+    # anterior en el cache hasta este TTL
+    READ_CACHE_TTL_SECONDS: float = 300
+    # max-age para clientes y CDN; con 0 revalidan siempre usando el ETag
+    READ_CACHE_MAX_AGE: int = 0
+    METRICS_ENABLED: bool = True
+    # "off", "on" o "header" (solo si el request trae X-Server-Timing: 1)
+    SERVER_TIMING: Literal["off", "on", "header"] = "off"
+    # Consultas más lentas que esto se registran en el logger app.slow_queries;
+    # 0 lo desactiva
+    SLOW_QUERY_MS: float = 200
+    # Perfilado por muestreo: fracción de requests (0-1) y/o header X-Profile: 1
+    PROFILE_SAMPLE_RATE: float = Field(default=0, ge=0, le=1)
+    PROFILE_HEADER: bool = False
+    PROFILE_INTERVAL_MS: float = 1
+    PROFILE_DIR: str = "./profiles"
+    # Prepara pool, consultas, JWT y hasher antes de aceptar tráfico (app.warmup)
+    WARMUP_ON_STARTUP: bool = True
+    # python -m app serve; con 0 workers se usa un proceso por núcleo (si los
+    # backends de revocación, rate limit y cache son compartidos; si no, uno)
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = Field(default=0, ge=0)
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: float = 30
+    DATABASE_URL: str = "sqlite:///./test.db"
+    # Aplica las migraciones pendientes en el lifespan. Con varios procesos
+    # conviene desactivarlo y correr `python -m app migrate` una vez antes
+    DB_MIGRATE_ON_STARTUP: bool = True
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+    # Negativo = tamaño en KiB (ver PRAGMA cache_size)
+    SQLITE_CACHE_SIZE: int = -65536
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        values = {name: os.environ[name] for name in cls.model_fields if name in os.environ}
+        try:
+            return cls(**values)
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{error['loc'][0]}: {error['msg']}" for error in e.errors()
+            )
+            raise RuntimeError(f"Invalid settings ({env_path}): {problems}") from None
 
 
-settings = Settings()
+settings = Settings.from_env()
@@ -1,13 +1,221 @@
-from passlib.context import CryptContext
+import asyncio
+import contextvars
+import functools
+import logging
+import math
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.routers.metrics.instrumentation import timed_operation
+from app.routers.tokens.env_settings import settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_ROUNDS_RANGE = (10, 16)
+ARGON2_TIME_COST_RANGE = (2, 10)
+
+
+def hashing_policy(
+    scheme: str = settings.PASSWORD_SCHEME,
+    bcrypt_rounds: int = settings.BCRYPT_ROUNDS,
+    argon2_time_cost: int = settings.ARGON2_TIME_COST,
+) -> dict:
+    """
+    Configuración de CryptContext. El esquema principal es el que se usa para
+    hashes nuevos; los demás solo verifican y quedan marcados como obsoletos,
+    igual que los hashes con un costo menor al configurado (min_rounds), así
+    `needs_update` los detecta para re-hashearlos.
+    """
+    if scheme not in ("bcrypt", "argon2"):
+        raise ValueError(f"Unsupported PASSWORD_SCHEME {scheme!r}")
+    schemes = [scheme] + [other for other in ("bcrypt", "argon2") if other != scheme]
+    return {
+        "schemes": schemes,
+        "default": scheme,
+        "deprecated": "auto",
+        "bcrypt__rounds": bcrypt_rounds,
+        "bcrypt__min_rounds": bcrypt_rounds,
+        "argon2__type": "ID",
+        "argon2__time_cost": argon2_time_cost,
+        "argon2__min_rounds": argon2_time_cost,
+        "argon2__memory_cost": settings.ARGON2_MEMORY_COST,
+        "argon2__parallelism": settings.ARGON2_PARALLELISM,
+    }
+
+
+@functools.cache
+def password_context() -> "CryptContext":
+    """
+    CryptContext de la app. passlib (y bcrypt/argon2 debajo) se carga con el
+    primer hash o en `Hasher.calibrate`, no al importar el módulo.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(**hashing_policy())
+
+
+class HasherBusyError(Exception):
+    pass
+
+
+class HashingPool:
+    """
+    Pool de hilos dedicado al hash de contraseñas. bcrypt y argon2 liberan el
+    GIL, así que el hash corre en paralelo sin bloquear el event loop. `max_pending` limita cuántas
+    operaciones pueden estar en cola o en ejecución a la vez.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hasher"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _call(self, fn, *args):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._queued + self._running >= self.max_pending:
+                self._rejected += 1
+                raise HasherBusyError("Hashing pool is saturated")
+            self._queued += 1
+        try:
+            # El contexto viaja con la tarea para atribuir el tiempo al request
+            context = contextvars.copy_context()
+            return self._executor.submit(context.run, self._call, fn, *args)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def run_sync(self, fn, *args):
+        return self.submit(fn, *args).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self._queued,
+                "in_flight": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+hashing_pool = HashingPool(
+    max_workers=settings.HASHER_MAX_WORKERS,
+    max_pending=settings.HASHER_MAX_PENDING,
+)
 
 
 class Hasher:
+    _dummy_hash: str | None = None
+
     @staticmethod
     def verify_password(plain_password, hashed_password):
-        return pwd_context.verify(plain_password, hashed_password)
+        with timed_operation("hash.verify"):
+            return password_context().verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password):
-        return pwd_context.hash(password)
\ No newline at end of file
+        with timed_operation("hash.hash"):
+            return password_context().hash(password)
+
+    @staticmethod
+    async def averify_password(plain_password, hashed_password):
+        return await hashing_pool.run(
+            Hasher.verify_password, plain_password, hashed_password
+        )
+
+    @staticmethod
+    async def aget_password_hash(password):
+        return await hashing_pool.run(Hasher.get_password_hash, password)
+
+    @staticmethod
+    def needs_update(hashed_password):
+        return password_context().needs_update(hashed_password)
+
+    @staticmethod
+    async def averify_dummy(plain_password):
+        """
+        Verifica contra un hash descartable con la política vigente, para que
+        un usuario inexistente tarde lo mismo que una contraseña incorrecta.
+        """
+        if Hasher._dummy_hash is None:
+            Hasher._dummy_hash = await Hasher.aget_password_hash(
+                secrets.token_urlsafe(16)
+            )
+        await Hasher.averify_password(plain_password, Hasher._dummy_hash)
+        return False
+
+    @staticmethod
+    def calibrate(target_ms: float = settings.PASSWORD_HASH_TARGET_MS) -> dict:
+        """
+        Ajusta el costo del esquema principal para que un hash tarde cerca de
+        `target_ms` en este host. Con bcrypt cada round duplica el tiempo; con
+        argon2id el tiempo crece linealmente con time_cost. Solo puede subir el
+        costo configurado (BCRYPT_ROUNDS, ARGON2_TIME_COST), nunca bajarlo.
+        """
+        from passlib.context import CryptContext
+
+        scheme = settings.PASSWORD_SCHEME
+        handler = password_context().handler(scheme)
+        if scheme == "argon2" and not handler.has_backend():
+            raise RuntimeError("PASSWORD_SCHEME=argon2 requires argon2-cffi")
+        if target_ms <= 0:
+            return {"scheme": scheme}
+
+        if scheme == "bcrypt":
+            low, high = BCRYPT_ROUNDS_RANGE
+            probe = CryptContext(**hashing_policy(scheme, bcrypt_rounds=low))
+            cost = low + round(math.log2(target_ms / _time_hash(probe)))
+            options = {"bcrypt_rounds": max(settings.BCRYPT_ROUNDS, low, min(high, cost))}
+        else:
+            low, high = ARGON2_TIME_COST_RANGE
+            probe = CryptContext(**hashing_policy(scheme, argon2_time_cost=low))
+            cost = round(low * target_ms / _time_hash(probe))
+            options = {
+                "argon2_time_cost": max(settings.ARGON2_TIME_COST, low, min(high, cost))
+            }
+
+        password_context().update(**hashing_policy(scheme, **options))
+        Hasher._dummy_hash = None
+        logger.info("Password hashing calibrated: %s %s", scheme, options)
+        return {"scheme": scheme, **options}
+
+
+def _time_hash(context: "CryptContext", samples: int = 3) -> float:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
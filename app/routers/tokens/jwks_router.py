@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from app.routers.tokens.env_settings import settings
+from app.routers.tokens.keys import keyring
+
+
+router = APIRouter()
+
+
+@router.get("/.well-known/jwks.json")
+def read_jwks(response: Response) -> dict:
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_MAX_AGE}"
+    return keyring.jwks()
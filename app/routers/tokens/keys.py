@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from pathlib import Path
+
+from app.routers.tokens.env_settings import settings
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_KID_FILE = "ACTIVE"
+
+
+class KeyRing:
+    """
+    Llaves para firmar y verificar JWT.
+
+    Con un algoritmo simétrico (HS256, ...) se usa SECRET_KEY y no se publica
+    nada en el JWKS. Con RS*/ES* las llaves viven en `keys_dir`:
+
+        <kid>.pem       llave privada (firma y verificación)
+        <kid>.pub.pem   solo llave pública (llaves retiradas que aún verifican)
+        ACTIVE          kid con el que se firman los tokens nuevos
+
+    Para rotar sin downtime: agregar la llave nueva, esperar a que los
+    verificadores refresquen el JWKS, cambiar ACTIVE y borrar la privada
+    anterior (dejando su .pub.pem) cuando expiren sus tokens. Los cambios se
+    leen con `reload()`, que además corre solo al firmar, verificar o servir el
+    JWKS si pasaron `reload_interval` segundos. Si esa recarga falla (archivo a
+    medio escribir, ACTIVE sin llave) se siguen usando las últimas llaves
+    válidas y se reintenta en el siguiente intervalo.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: str | None = None,
+        keys_dir: str | None = None,
+        reload_interval: float = 60,
+    ):
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self.keys_dir = Path(keys_dir) if keys_dir else None
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._private: dict[str, str] = {}
+        self._public: dict[str, str] = {}
+        self._active_kid: str | None = None
+        self._jwks: dict = {"keys": []}
+        self._loaded_at = 0.0
+        if self.is_asymmetric:
+            self.reload()
+
+    @property
+    def is_asymmetric(self) -> bool:
+        return not self.algorithm.upper().startswith("HS")
+
+    def reload(self) -> None:
+        if not self.is_asymmetric:
+            return
+        if self.keys_dir is None:
+            raise RuntimeError(f"JWT_KEYS_DIR is required for {self.algorithm}")
+        # cryptography solo hace falta con claves asimétricas
+        from cryptography.hazmat.primitives import serialization
+
+        private, public = {}, {}
+        for path in sorted(self.keys_dir.glob("*.pem")):
+            if path.name.endswith(".pub.pem"):
+                public[path.name[: -len(".pub.pem")]] = path.read_text()
+                continue
+            pem = path.read_bytes()
+            key = serialization.load_pem_private_key(pem, password=None)
+            private[path.stem] = pem.decode()
+            public[path.stem] = (
+                key.public_key()
+                .public_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PublicFormat.SubjectPublicKeyInfo,
+                )
+                .decode()
+            )
+        active_file = self.keys_dir / ACTIVE_KID_FILE
+        active_kid = active_file.read_text().strip() if active_file.exists() else None
+        if active_kid is None and private:
+            active_kid = sorted(private)[-1]
+        if active_kid not in private:
+            raise RuntimeError(f"No private key for active kid {active_kid!r}")
+        jwks = {"keys": [self._to_jwk(kid, pem) for kid, pem in public.items()]}
+        with self._lock:
+            self._private, self._public = private, public
+            self._active_kid = active_kid
+            self._jwks = jwks
+            self._loaded_at = time.monotonic()
+
+    def refresh_if_stale(self) -> None:
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.reload_interval:
+                return
+            # Un solo request recarga por intervalo, aunque falle
+            self._loaded_at = time.monotonic()
+        try:
+            self.reload()
+        except Exception:
+            logger.exception("Could not reload JWT keys, keeping the last good ones")
+
+    def signing_key(self) -> tuple[str | None, str]:
+        if not self.is_asymmetric:
+            return None, self.secret_key
+        self.refresh_if_stale()
+        with self._lock:
+            return self._active_kid, self._private[self._active_kid]
+
+    def verification_key(self, kid: str | None) -> str | None:
+        if not self.is_asymmetric:
+            return self.secret_key
+        self.refresh_if_stale()
+        with self._lock:
+            return self._public.get(kid)
+
+    def jwks(self) -> dict:
+        # Se arma una sola vez por reload, no en cada request
+        self.refresh_if_stale()
+        return self._jwks
+
+    def _to_jwk(self, kid: str, pem: str) -> dict:
+        from jose import jwk
+
+        entry = jwk.construct(pem, self.algorithm).to_dict()
+        entry.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+        return entry
+
+
+keyring = KeyRing(
+    algorithm=settings.ALGORITHM,
+    secret_key=settings.SECRET_KEY,
+    keys_dir=settings.JWT_KEYS_DIR,
+    reload_interval=settings.JWT_KEYS_RELOAD_SECONDS,
+)
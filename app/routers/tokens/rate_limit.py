@@ -0,0 +1,105 @@
+import importlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from app.routers.tokens.env_settings import settings
+
+
+class MemoryRateLimitBackend:
+    """
+    Contador de ventana deslizante en memoria, por proceso. Aproxima la ventana
+    con el conteo de la ventana fija actual más la fracción que aún cubre de la
+    anterior, así que usa memoria constante por llave. Para varios workers hay
+    que usar un backend compartido con el mismo método `hit`.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # llave -> (inicio de la ventana actual, conteo actual, conteo anterior),
+        # ordenado por inicio de ventana: las llaves vencidas quedan al frente
+        self._windows: OrderedDict[str, tuple[float, int, int]] = OrderedDict()
+
+    def hit(self, limits: list[tuple[str, int]], window: float) -> float | None:
+        """
+        Registra un intento en cada llave de `limits` (pares llave, límite).
+        Si alguna ya excede su límite no se registra en ninguna y se devuelven
+        los segundos de espera.
+        """
+        now = time.time()
+        start = now - now % window
+        weight = 1 - (now - start) / window
+        with self._lock:
+            counts = [(key, limit, *self._counts(key, start, window)) for key, limit in limits]
+            waits = [
+                self._retry_after(now, start, window, limit, current, previous)
+                for _, limit, current, previous in counts
+                if previous * weight + current >= limit
+            ]
+            if waits:
+                return max(waits)
+            for key, _, current, previous in counts:
+                if key in self._windows and self._windows[key][0] != start:
+                    self._windows.move_to_end(key)
+                self._windows[key] = (start, current + 1, previous)
+            self._evict(start - window)
+        return None
+
+    def _counts(self, key: str, start: float, window: float) -> tuple[int, int]:
+        window_start, current, previous = self._windows.get(key, (start, 0, 0))
+        if window_start != start:
+            previous = current if start - window_start == window else 0
+            current = 0
+        return current, previous
+
+    @staticmethod
+    def _retry_after(now, start, window, limit, current, previous) -> float:
+        if current >= limit or previous == 0:
+            return start + window - now
+        # Momento en que el peso de la ventana anterior baja lo suficiente
+        weight_needed = (limit - current) / previous
+        return max(0.0, start + window * (1 - weight_needed) - now)
+
+    def _evict(self, older_than: float) -> None:
+        # Costo amortizado O(1): cada llave sale del frente una sola vez
+        while self._windows:
+            key, (window_start, _, _) = next(iter(self._windows.items()))
+            if window_start >= older_than and len(self._windows) <= self.max_keys:
+                return
+            # Vencida, o la más vieja si todas siguen vivas y se pasó de max_keys
+            self._windows.popitem(last=False)
+
+
+class LoginThrottle:
+    def __init__(self, backend, per_username: int, per_ip: int, window: float):
+        self.backend = backend
+        self.per_username = per_username
+        self.per_ip = per_ip
+        self.window = window
+
+    def check(self, username: str, client_ip: str | None) -> int | None:
+        """Devuelve el Retry-After en segundos, o None si el intento procede."""
+        # Ambos límites se evalúan antes de contar: un intento que rechaza el
+        # límite por IP no consume el cupo del usuario (ni al revés)
+        limits = [(f"login:user:{username.lower()}", self.per_username)]
+        if client_ip:
+            limits.append((f"login:ip:{client_ip}", self.per_ip))
+        wait = self.backend.hit(limits, self.window)
+        return math.ceil(wait) or 1 if wait is not None else None
+
+
+def load_backend(path: str):
+    if path == "memory":
+        return MemoryRateLimitBackend()
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+login_throttle = LoginThrottle(
+    backend=load_backend(settings.RATE_LIMIT_BACKEND),
+    per_username=settings.LOGIN_RATE_PER_USERNAME,
+    per_ip=settings.LOGIN_RATE_PER_IP,
+    window=settings.LOGIN_RATE_WINDOW_SECONDS,
+)
@@ -0,0 +1,174 @@
+import hashlib
+import importlib
+import threading
+import time
+from dataclasses import dataclass
+
+from app.routers.tokens.env_settings import settings
+
+
+class BloomFilter:
+    """
+    Conjunto probabilístico: `might_contain` nunca da falsos negativos, así que
+    un jti que no está en el filtro seguro no fue revocado y no hace falta
+    consultar el backend.
+    """
+
+    def __init__(self, size_bits: int, hashes: int):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self._bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode(), digest_size=8 * self.hashes).digest()
+        for i in range(self.hashes):
+            chunk = digest[i * 8 : (i + 1) * 8]
+            yield int.from_bytes(chunk, "little") % self.size_bits
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, value: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+@dataclass
+class RefreshRecord:
+    username: str
+    family: str
+    expires_at: float
+    used: bool = False
+    # Scopes pedidos al iniciar la sesión; None = todos los de sus roles
+    scopes: list[str] | None = None
+
+
+class MemoryRevocationBackend:
+    """
+    Backend local en memoria. Sirve para desarrollo y para un solo worker; con
+    varios procesos hay que usar un backend compartido con la misma interfaz
+    (ver REVOCATION_BACKEND).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._denied: dict[str, float] = {}
+        self._denied_log: list[tuple[float, str, float]] = []
+        self._refresh: dict[str, RefreshRecord] = {}
+        self._revoked_families: dict[str, float] = {}
+
+    def deny(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._denied[jti] = expires_at
+            self._denied_log.append((time.time(), jti, expires_at))
+
+    def is_denied(self, jti: str) -> bool:
+        with self._lock:
+            expires_at = self._denied.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def denied_since(self, since: float) -> list[tuple[str, float]]:
+        with self._lock:
+            return [(jti, exp) for ts, jti, exp in self._denied_log if ts >= since]
+
+    def store_refresh(self, jti: str, record: RefreshRecord) -> None:
+        with self._lock:
+            self._refresh[jti] = record
+
+    def consume_refresh(self, jti: str) -> tuple[str, RefreshRecord | None]:
+        """Devuelve ("ok" | "reused" | "unknown", registro)."""
+        with self._lock:
+            record = self._refresh.get(jti)
+            if record is None or record.expires_at <= time.time():
+                return "unknown", None
+            if record.family in self._revoked_families:
+                return "unknown", record
+            if record.used:
+                return "reused", record
+            record.used = True
+            return "ok", record
+
+    def revoke_family(self, family: str, expires_at: float) -> None:
+        with self._lock:
+            self._revoked_families[family] = expires_at
+
+    def purge(self) -> None:
+        now = time.time()
+        with self._lock:
+            self._denied = {k: v for k, v in self._denied.items() if v > now}
+            self._denied_log = [e for e in self._denied_log if e[2] > now]
+            self._refresh = {
+                k: v for k, v in self._refresh.items() if v.expires_at > now
+            }
+            self._revoked_families = {
+                k: v for k, v in self._revoked_families.items() if v > now
+            }
+
+
+class RevocationStore:
+    """
+    Denylist de jti de access tokens. El filtro Bloom local responde el caso
+    común (token no revocado) sin tocar el backend; solo los positivos, reales
+    o falsos, se confirman contra él. Cada `sync_interval` segundos se traen
+    las revocaciones hechas por otros procesos y se purgan las expiradas.
+    """
+
+    def __init__(self, backend, bloom_size: int, bloom_hashes: int, sync_interval):
+        self.backend = backend
+        self.bloom_size = bloom_size
+        self.bloom_hashes = bloom_hashes
+        self.sync_interval = sync_interval
+        self._bloom = BloomFilter(bloom_size, bloom_hashes)
+        self._lock = threading.Lock()
+        self._synced_at = time.time()
+        self._purged_at = time.time()
+
+    def revoke_access(self, jti: str, expires_at: float) -> None:
+        self.backend.deny(jti, expires_at)
+        self._bloom.add(jti)
+
+    def is_access_revoked(self, jti: str | None) -> bool:
+        if jti is None:
+            return False
+        self._maybe_sync()
+        if not self._bloom.might_contain(jti):
+            return False
+        return self.backend.is_denied(jti)
+
+    def _maybe_sync(self) -> None:
+        now = time.time()
+        if now - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            if now - self._synced_at < self.sync_interval:
+                return
+            since, self._synced_at = self._synced_at, now
+            if now - self._purged_at >= self.sync_interval * 60:
+                # Un filtro Bloom no permite borrar: se reconstruye sin las
+                # entradas expiradas.
+                self.backend.purge()
+                bloom = BloomFilter(self.bloom_size, self.bloom_hashes)
+                for jti, _ in self.backend.denied_since(0):
+                    bloom.add(jti)
+                self._bloom, self._purged_at = bloom, now
+            else:
+                for jti, _ in self.backend.denied_since(since - self.sync_interval):
+                    self._bloom.add(jti)
+
+
+def load_backend(path: str):
+    if path == "memory":
+        return MemoryRevocationBackend()
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+revocation_store = RevocationStore(
+    backend=load_backend(settings.REVOCATION_BACKEND),
+    bloom_size=settings.REVOCATION_BLOOM_BITS,
+    bloom_hashes=settings.REVOCATION_BLOOM_HASHES,
+    sync_interval=settings.REVOCATION_SYNC_SECONDS,
+)
@@ -0,0 +1,68 @@
+import json
+import threading
+
+from sqlalchemy import event, select
+
+from app.db.core import DBRole, async_session_local
+from app.routers.tokens.env_settings import settings
+
+
+DEFAULT_ROLE_SCOPES = {
+    "admin": [
+        "users:read",
+        "users:write",
+        "posts:write",
+        "tags:write",
+        "categories:write",
+    ],
+    "editor": ["posts:write", "tags:write", "categories:write"],
+    "author": ["posts:write"],
+}
+
+
+class PermissionMap:
+    """
+    Mapa precalculado slug de rol -> scopes. Solo incluye roles que existen en
+    la tabla `roles`, así que borrar un rol le quita sus permisos a los tokens
+    ya emitidos. Se carga en el lifespan; cualquier cambio en DBRole marca el
+    mapa como sucio y se recarga (con la sesión async, sin bloquear el event
+    loop) en la siguiente consulta. Fuera de eso no toca la base de datos.
+    """
+
+    def __init__(self, role_scopes: dict[str, list[str]]):
+        self.role_scopes = {
+            role: frozenset(scopes) for role, scopes in role_scopes.items()
+        }
+        self._lock = threading.Lock()
+        self._scopes: dict[str, frozenset[str]] = {}
+        self._dirty = True
+
+    async def reload(self) -> None:
+        # Antes de consultar: un cambio durante la consulta lo vuelve a marcar
+        self._dirty = False
+        async with async_session_local() as session:
+            slugs = (await session.scalars(select(DBRole.slug))).all()
+        scopes = {slug: self.role_scopes.get(slug, frozenset()) for slug in slugs}
+        with self._lock:
+            self._scopes = scopes
+
+    def invalidate(self) -> None:
+        self._dirty = True
+
+    async def scopes_for(self, roles) -> frozenset[str]:
+        if self._dirty:
+            await self.reload()
+        scopes = self._scopes
+        return frozenset().union(*(scopes.get(role, ()) for role in roles))
+
+
+permission_map = PermissionMap(
+    json.loads(settings.ROLE_SCOPES) if settings.ROLE_SCOPES else DEFAULT_ROLE_SCOPES
+)
+
+
+@event.listens_for(DBRole, "after_insert")
+@event.listens_for(DBRole, "after_update")
+@event.listens_for(DBRole, "after_delete")
+def _invalidate_permission_map(mapper, connection, target: DBRole):
+    permission_map.invalidate()
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event, inspect
+
+from app.db.core import DBUser
+from app.routers.tokens.env_settings import settings
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    claims: dict
+    user: object
+    expires_at: float
+
+
+class TokenCache:
+    """
+    Cache LRU acotado de tokens ya verificados. La llave es el sha256 del token
+    para no guardar bearer tokens en memoria en claro. Cada entrada vive hasta
+    el `exp` del token o hasta `ttl` segundos, lo que ocurra primero.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedToken]" = OrderedDict()
+        self._by_username: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> CachedToken | None:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, token: str, claims: dict, user) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if claims.get("exp") is not None:
+            expires_at = min(expires_at, float(claims["exp"]))
+        key = self._key(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CachedToken(claims, user, expires_at)
+            self._by_username.setdefault(user.username, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, username: str) -> None:
+        with self._lock:
+            for key in list(self._by_username.get(username, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_username.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_username.get(entry.user.username)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_username[entry.user.username]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(DBUser, "after_update")
+@event.listens_for(DBUser, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: DBUser):
+    # Si cambió el username, también hay que invalidar las llaves del anterior.
+    previous = inspect(target).attrs.username.history.deleted or ()
+    for username in (target.username, *previous):
+        token_cache.invalidate_user(username)
@@ -1,14 +1,30 @@
+import time
 from datetime import timedelta
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from app.db.core import get_db
-from app.models.token_model import Token, authenticate_user, create_access_token
-from sqlalchemy.orm import Session
+from jose import JWTError
+from app.db.core import get_async_db
+from app.models.token_model import (
+    Token,
+    aget_user,
+    authenticate_user,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    oauth2_scheme,
+)
+from app.models.user_model import aread_db_user_role_slugs
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.routers.tokens.env_settings import settings
+from app.routers.tokens.hasher import HasherBusyError
+from app.routers.tokens.rate_limit import login_throttle
+from app.routers.tokens.revocation import revocation_store
+from app.routers.tokens.scopes import permission_map
 
 
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_FAMILY_TTL = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
 
 
 router = APIRouter(
@@ -16,12 +32,70 @@ router = APIRouter(
 )
 
 
+async def issue_tokens(
+    db: AsyncSession,
+    user,
+    family: str | None = None,
+    requested_scopes: list[str] | None = None,
+) -> Token:
+    # Roles y scopes van en el token para no cargar DBUser.roles en cada request
+    roles = await aread_db_user_role_slugs(user.id, db)
+    scopes = await permission_map.scopes_for(roles)
+    # Una lista vacía también restringe: nunca se amplía a todos los roles
+    if requested_scopes is not None:
+        scopes = scopes & set(requested_scopes)
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={
+            "sub": user.username,
+            "uid": user.id,
+            "disabled": user.is_disabled,
+            "roles": roles,
+            "scope": " ".join(sorted(scopes)),
+        },
+        expires_delta=access_token_expires,
+    )
+    refresh_token = create_refresh_token(
+        user.username,
+        family,
+        sorted(scopes) if requested_scopes is not None else None,
+    )
+    return Token(
+        access_token=access_token, token_type="bearer", refresh_token=refresh_token
+    )
+
+
+def invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 @router.post("/")
 async def login_for_access_token(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Token:
-    user = authenticate_user(db, form_data.username, form_data.password)
+    # Se rechaza antes de tocar bcrypt: un intento bloqueado no cuesta CPU
+    client_ip = request.client.host if request.client else None
+    retry_after = login_throttle.check(form_data.username, client_ip)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(retry_after)},
+        )
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except HasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress",
+            headers={"Retry-After": "1"},
+        ) from e
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,8 +103,63 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+    return await issue_tokens(db, user, requested_scopes=form_data.scopes or None)
+
+
+@router.post("/refresh")
+async def refresh_access_token(
+    refresh_token: Annotated[str, Form()],
+    db: AsyncSession = Depends(get_async_db),
+) -> Token:
+    try:
+        payload = decode_token(refresh_token)
+    except JWTError as e:
+        raise invalid_refresh_token() from e
+    if payload.get("typ") != "refresh":
+        raise invalid_refresh_token()
+
+    outcome, record = revocation_store.backend.consume_refresh(payload["jti"])
+    if outcome == "reused":
+        # Un refresh token usado dos veces indica robo: se corta toda la sesión
+        revocation_store.backend.revoke_family(
+            record.family, time.time() + REFRESH_FAMILY_TTL
+        )
+        raise invalid_refresh_token()
+    if outcome != "ok":
+        raise invalid_refresh_token()
+
+    user = await aget_user(db, record.username)
+    if user is None or user.is_disabled:
+        raise invalid_refresh_token()
+    return await issue_tokens(
+        db, user, family=record.family, requested_scopes=record.scopes
     )
-    return Token(access_token=access_token, token_type="bearer")
+
+
+@router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_tokens(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    refresh_token: Annotated[str | None, Form()] = None,
+):
+    try:
+        payload = decode_token(token)
+    except JWTError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from e
+    if payload.get("jti"):
+        revocation_store.revoke_access(payload["jti"], float(payload["exp"]))
+    if refresh_token:
+        try:
+            refresh_payload = decode_token(refresh_token)
+        except JWTError:
+            return
+        # Solo un refresh token identifica una familia; cualquier otro se ignora
+        if refresh_payload.get("typ") != "refresh":
+            return
+        if refresh_payload.get("sub") == payload.get("sub"):
+            revocation_store.backend.revoke_family(
+                refresh_payload["fam"], time.time() + REFRESH_FAMILY_TTL
+            )
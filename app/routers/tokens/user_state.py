@@ -0,0 +1,53 @@
+import threading
+
+from sqlalchemy import event, select
+
+from app.db.core import DBUser, async_session_local
+
+
+class DisabledUserRegistry:
+    """
+    Ids de usuarios deshabilitados o borrados, en memoria. Permite confiar en
+    los claims del token sin consultar `users`: se carga una vez en el
+    lifespan (con la sesión async) y después se mantiene al día con los
+    eventos de DBUser de este proceso.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: set[int] = set()
+        self._loaded = False
+
+    async def load(self) -> None:
+        async with async_session_local() as session:
+            ids = set(
+                await session.scalars(select(DBUser.id).where(DBUser.is_disabled))
+            )
+        with self._lock:
+            self._ids |= ids
+            self._loaded = True
+
+    async def is_disabled(self, user_id: int) -> bool:
+        if not self._loaded:
+            await self.load()
+        return user_id in self._ids
+
+    def set_disabled(self, user_id: int, disabled: bool) -> None:
+        with self._lock:
+            if disabled:
+                self._ids.add(user_id)
+            else:
+                self._ids.discard(user_id)
+
+
+disabled_users = DisabledUserRegistry()
+
+
+@event.listens_for(DBUser, "after_update")
+def _track_disabled_user(mapper, connection, target: DBUser):
+    disabled_users.set_disabled(target.id, bool(target.is_disabled))
+
+
+@event.listens_for(DBUser, "after_delete")
+def _track_deleted_user(mapper, connection, target: DBUser):
+    disabled_users.set_disabled(target.id, True)
@@ -1,9 +1,14 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, Request
-from app.db.core import get_db
-from app.models.user_model import User, create_db_user, UserCreate
-from app.models.token_model import get_current_active_user
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from app.db.core import get_async_db
+from app.models.user_model import User, acreate_db_user, UserCreate
+from app.models.token_model import (
+    Principal,
+    get_current_active_principal,
+    get_current_active_user,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.routers.tokens.hasher import HasherBusyError
 
 
 router = APIRouter(
@@ -20,16 +25,22 @@ async def read_users_me(
 
 @router.get("/me/items/")
 async def read_own_items(
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[Principal, Depends(get_current_active_principal)],
 ):
     return [{"item_id": "Foo", "owner": current_user.username}]
 
 
 @router.post("/create")
-def create_user(
+async def create_user(
     # current_user: Annotated[User, Depends(get_current_active_user)],
     user: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User:
-    db_user = create_db_user(user, db)
-    return User(**db_user.__dict__)
+    try:
+        db_user = await acreate_db_user(user, db)
+    except HasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": "1"},
+        ) from e
+    return User.model_validate(db_user)
@@ -0,0 +1,250 @@
+"""
+Supervisor multiproceso de `python -m app serve`.
+
+El proceso principal abre el socket una vez y arranca N workers de uvicorn
+que lo comparten (el kernel reparte las conexiones). Cada worker hace su
+warmup en el lifespan y recién después empieza a aceptar conexiones, así que
+un worker frío nunca recibe tráfico.
+
+Señales del proceso principal:
+    SIGTERM / SIGINT  apagado ordenado (cada worker termina sus requests)
+    SIGHUP            reinicio gradual: se aplican las migraciones con el
+                      código nuevo (`python -m app migrate` en un proceso
+                      aparte), y por cada worker se levanta uno nuevo, se
+                      espera a que esté listo y recién entonces se detiene el
+                      viejo. Los workers nuevos importan el código de nuevo,
+                      así que sirve para desplegar sin cortar tráfico.
+Si un worker muere inesperadamente se reemplaza; si muere antes de quedar
+listo (error en el lifespan) el supervisor se detiene en lugar de reintentar
+en un ciclo.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.context import SpawnProcess
+from multiprocessing.synchronize import Event
+from socket import socket
+
+import uvicorn
+
+# Mismo logger que el supervisor de uvicorn, configurado por uvicorn.Config
+logger = logging.getLogger("uvicorn.error")
+
+spawn = multiprocessing.get_context("spawn")
+
+# Tiempo máximo para que un worker nuevo termine el lifespan (calibración y
+# warmup) durante un reinicio gradual
+WORKER_STARTUP_TIMEOUT_SECONDS = 120
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def process_local_backends(settings) -> list[str]:
+    """
+    Backends "memory": su estado vive en cada proceso. Con varios workers un
+    refresh token emitido por uno es desconocido para los demás, una
+    revocación o una invalidación de cache solo vale en el worker que la hizo
+    y el límite de logins se multiplica por la cantidad de workers.
+
+    No incluye los caches que siempre son por proceso y no tienen backend
+    compartido: token_cache, disabled_users y permission_map. Cada worker los
+    mantiene al día solo con los cambios que hace él mismo, así que deshabilitar
+    un usuario o quitar un rol en un worker no corta los access tokens ya
+    emitidos en los demás hasta que vencen (ACCESS_TOKEN_EXPIRE_MINUTES; el
+    refresh sí consulta la base de datos) o hasta un reinicio (SIGHUP). Con
+    varios workers conviene un ACCESS_TOKEN_EXPIRE_MINUTES corto.
+    """
+    return [
+        name
+        for name in ("REVOCATION_BACKEND", "RATE_LIMIT_BACKEND", "READ_CACHE_BACKEND")
+        if getattr(settings, name) == "memory"
+    ]
+
+
+class WarmServer(uvicorn.Server):
+    """Server de uvicorn que avisa al supervisor cuando ya acepta conexiones."""
+
+    def __init__(self, config: uvicorn.Config, ready: Event):
+        super().__init__(config)
+        self.ready = ready
+
+    async def startup(self, sockets: list[socket] | None = None) -> None:
+        # El lifespan (y el warmup) corre antes de empezar a escuchar
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            self.ready.set()
+
+
+def run_worker(config: uvicorn.Config, sockets: list[socket], ready: Event) -> None:
+    config.configure_logging()
+    WarmServer(config, ready).run(sockets=sockets)
+
+
+class Worker:
+    def __init__(self, config: uvicorn.Config, sockets: list[socket]):
+        self.ready = spawn.Event()
+        self.process: SpawnProcess = spawn.Process(
+            target=run_worker, args=(config, sockets, self.ready), daemon=False
+        )
+
+    def start(self) -> "Worker":
+        self.process.start()
+        return self
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def terminate(self) -> None:
+        # SIGTERM: uvicorn deja de aceptar y espera los requests en curso
+        self.process.terminate()
+
+    def join(self, timeout: float) -> None:
+        self.process.join(timeout)
+        if self.process.is_alive():
+            logger.warning("Worker %s did not stop in time, killing", self.process.pid)
+            self.process.kill()
+            self.process.join()
+
+
+class Supervisor:
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        graceful_timeout: float,
+        migrate_on_reload: bool = True,
+        startup_timeout: float = WORKER_STARTUP_TIMEOUT_SECONDS,
+    ):
+        self.config = config
+        self.migrate_on_reload = migrate_on_reload
+        self.workers_count = workers
+        self.graceful_timeout = graceful_timeout
+        self.startup_timeout = startup_timeout
+        self.workers: list[Worker] = []
+        self.sockets: list[socket] = []
+        self.should_exit = False
+        self.should_reload = False
+        self.failed = False
+        self._wakeup = threading.Event()
+
+    def handle_exit(self, sig, frame) -> None:
+        self.should_exit = True
+        self._wakeup.set()
+
+    def handle_reload(self, sig, frame) -> None:
+        self.should_reload = True
+        self._wakeup.set()
+
+    def spawn_worker(self) -> Worker:
+        worker = Worker(self.config, self.sockets).start()
+        self.workers.append(worker)
+        logger.info("Started worker %s", worker.process.pid)
+        return worker
+
+    def stop_worker(self, worker: Worker) -> None:
+        self.workers.remove(worker)
+        worker.terminate()
+        worker.join(self.graceful_timeout)
+        logger.info("Stopped worker %s", worker.process.pid)
+
+    def stop_all(self) -> None:
+        workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.terminate()
+        deadline = time.monotonic() + self.graceful_timeout
+        for worker in workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+
+    def wait_ready(self, worker: Worker) -> bool:
+        # En intervalos cortos para atender un SIGTERM mientras tanto
+        deadline = time.monotonic() + self.startup_timeout
+        while not self.should_exit and time.monotonic() < deadline:
+            if worker.ready.wait(0.5):
+                return worker.is_alive()
+            if not worker.is_alive():
+                return False
+        return False
+
+    def migrate(self) -> bool:
+        """
+        Migra con el código desplegado: en un proceso nuevo, porque este
+        tiene importadas las migraciones de cuando arrancó. No se interrumpe
+        con SIGTERM para no cortar una migración a la mitad.
+        """
+        result = subprocess.run([sys.executable, "-m", "app", "migrate"])
+        return result.returncode == 0
+
+    def rolling_restart(self) -> None:
+        if self.migrate_on_reload and not self.migrate():
+            # Se conservan los workers viejos: el esquema no cambió
+            logger.error("Migration failed, aborting reload")
+            return
+        for old in list(self.workers):
+            if self.should_exit:
+                return
+            new = self.spawn_worker()
+            if not self.wait_ready(new):
+                if self.should_exit:
+                    # stop_all detiene también al worker nuevo
+                    return
+                # Se conservan los workers viejos: el código nuevo no arranca
+                logger.error("New worker failed to start, aborting reload")
+                self.stop_worker(new)
+                return
+            self.stop_worker(old)
+        logger.info("Reload complete")
+
+    def replace_dead_workers(self) -> None:
+        for worker in list(self.workers):
+            if worker.is_alive():
+                continue
+            if not worker.ready.is_set():
+                logger.error(
+                    "Worker %s failed during startup (exit code %s)",
+                    worker.process.pid,
+                    worker.process.exitcode,
+                )
+                self.workers.remove(worker)
+                self.failed = True
+                self.should_exit = True
+                return
+            logger.warning(
+                "Worker %s exited with code %s, replacing it",
+                worker.process.pid,
+                worker.process.exitcode,
+            )
+            self.workers.remove(worker)
+            self.spawn_worker()
+
+    def run(self) -> int:
+        self.sockets = [self.config.bind_socket()]
+        signal.signal(signal.SIGINT, self.handle_exit)
+        signal.signal(signal.SIGTERM, self.handle_exit)
+        signal.signal(signal.SIGHUP, self.handle_reload)
+        logger.info(
+            "Supervisor %s serving with %s workers", os.getpid(), self.workers_count
+        )
+        for _ in range(self.workers_count):
+            self.spawn_worker()
+
+        while not self.should_exit:
+            self._wakeup.wait(0.5)
+            self._wakeup.clear()
+            if self.should_reload:
+                self.should_reload = False
+                self.rolling_restart()
+            if not self.should_exit:
+                self.replace_dead_workers()
+
+        self.stop_all()
+        for sock in self.sockets:
+            sock.close()
+        logger.info("Supervisor stopped")
+        return 1 if self.failed else 0
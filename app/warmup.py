@@ -0,0 +1,83 @@
+"""
+Calentamiento de un proceso antes de que reciba tráfico: evita que los
+primeros requests después de un deploy paguen conexiones nuevas, la
+compilación de las consultas, la importación diferida de jose/passlib/slugify
+y el primer hash de contraseña.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from app.db import core
+from app.db.core import NotFoundError, async_session_local, session_local
+from app.models.category_model import read_db_categories, read_db_category
+from app.models.post_model import POST_DETAIL_OPTIONS, read_db_post, read_db_posts
+from app.models.slug import slugify
+from app.models.tag_model import read_db_tag, read_db_tags
+from app.models.token_model import aget_user, create_access_token, decode_token
+from app.models.user_model import aread_db_user_role_slugs
+from app.routers.tokens.hasher import Hasher
+
+logger = logging.getLogger(__name__)
+
+
+def prime_pool() -> int:
+    """Abre de una vez las conexiones permanentes del pool síncrono."""
+    size = getattr(core.engine.pool, "size", lambda: 1)()
+    connections = [core.engine.connect() for _ in range(size)]
+    for connection in connections:
+        connection.close()
+    return size
+
+
+async def aprime_pool() -> int:
+    size = getattr(core.async_engine.sync_engine.pool, "size", lambda: 1)()
+    connections = [await core.async_engine.connect() for _ in range(size)]
+    for connection in connections:
+        await connection.close()
+    return size
+
+
+def precompile_queries() -> None:
+    """
+    Ejecuta las consultas de las rutas más usadas con ids que no existen.
+    SQLAlchemy guarda el SQL compilado por engine según la forma de la
+    consulta, no sus valores, así que después los requests reales lo reutilizan.
+    """
+    with session_local() as session:
+        for read_one in (read_db_tag, read_db_category, read_db_post):
+            try:
+                read_one(0, session)
+            except NotFoundError:
+                pass
+        read_db_tags(session)
+        read_db_categories(session)
+        read_db_posts(session)
+        read_db_posts(session, category_id=0)
+        read_db_posts(session, tag_id=0)
+        read_db_posts(session, options=POST_DETAIL_OPTIONS)
+
+
+async def aprecompile_queries() -> None:
+    async with async_session_local() as session:
+        await aget_user(session, "")
+        await aread_db_user_role_slugs(0, session)
+
+
+async def warm_up() -> dict:
+    start = time.perf_counter()
+    connections = prime_pool() + await aprime_pool()
+    precompile_queries()
+    await aprecompile_queries()
+    # Carga jose.jwt y el backend de firma
+    decode_token(create_access_token({"sub": "warmup"}, timedelta(minutes=1)))
+    slugify("warmup")
+    # Crea el hash descartable de los logins con usuario inexistente y levanta
+    # los hilos del pool de hashing
+    await Hasher.averify_dummy("warmup")
+    summary = {
+        "connections": connections,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    logger.info("Warmup done: %s", summary)
+    return summary
@@ -0,0 +1,126 @@
+"""
+Suite de benchmarks: micro-benchmarks, carga en proceso y comparación.
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks compare baseline.json results.json --threshold 0.1
+
+`run` usa siempre una base SQLite temporal con datos generados por
+benchmarks.seed; `compare` sale con código 1 si alguna métrica empeora más
+que el umbral.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.results import compare, environment, load_results, write_results
+
+# Valores que la app exige al importar; no pisan los que ya estén definidos
+BENCH_ENV = {
+    "SECRET_KEY": "benchmark-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    # El limitador de login rechazaría la carga de /token/
+    "LOGIN_RATE_PER_USERNAME": str(10**9),
+    "LOGIN_RATE_PER_IP": str(10**9),
+}
+
+
+def run(args) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        # Se fija antes de importar la app: settings se lee una sola vez
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'benchmark.db'}"
+        for key, value in BENCH_ENV.items():
+            os.environ.setdefault(key, value)
+
+        from app.routers.tokens.env_settings import settings
+        from benchmarks.load import run_load
+        from benchmarks.micro import run_micro
+        from benchmarks.seed import SeedConfig
+
+        config = SeedConfig(
+            users=args.users,
+            categories=args.categories,
+            tags=args.tags,
+            posts=args.posts,
+            seed=args.seed,
+        )
+
+        results = {
+            "environment": environment(),
+            "config": {
+                "seed": config.as_dict(),
+                "iterations": args.iterations,
+                "requests": args.requests,
+                "login_requests": args.login_requests,
+                "concurrency": args.concurrency,
+                "password_scheme": settings.PASSWORD_SCHEME,
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            },
+        }
+        if args.only in (None, "micro"):
+            results["micro"] = run_micro(args.iterations)
+        if args.only in (None, "load"):
+            results["load"] = asyncio.run(
+                run_load(config, args.requests, args.login_requests, args.concurrency)
+            )
+
+    for section in ("micro", "load"):
+        for name, summary in results.get(section, {}).items():
+            rps = f"{summary['rps']:>10.1f} rps" if "rps" in summary else ""
+            print(
+                f"{section:<6}{name:<22}"
+                f"{summary['p50_ms']:>10.3f}ms p50"
+                f"{summary['p99_ms']:>10.3f}ms p99{rps}"
+            )
+    if args.output:
+        write_results(args.output, results)
+    return 0
+
+
+def compare_command(args) -> int:
+    rows = compare(
+        load_results(args.baseline), load_results(args.current), args.threshold
+    )
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<30}{row['metric']:<8}"
+            f"{row['baseline']:>12.3f}{row['current']:>12.3f}"
+            f"{row['change']:>+10.1%}  {flag}"
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--output", help="write JSON results to this path")
+    run_parser.add_argument("--only", choices=("micro", "load"))
+    run_parser.add_argument("--iterations", type=int, default=2000)
+    run_parser.add_argument("--requests", type=int, default=1000)
+    run_parser.add_argument("--login-requests", type=int, default=50)
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--users", type=int, default=1000)
+    run_parser.add_argument("--categories", type=int, default=50)
+    run_parser.add_argument("--tags", type=int, default=200)
+    run_parser.add_argument("--posts", type=int, default=10000)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.set_defaults(handler=compare_command)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
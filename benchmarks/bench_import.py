@@ -0,0 +1,97 @@
+"""
+Presupuesto de tiempo de importación de la app (`import main`), medido con
+`python -X importtime` en un proceso nuevo. Falla (código 1) si se pasa del
+presupuesto o si al importar se cargan módulos que deben cargarse tarde
+(alembic, passlib, jose.jwt, cryptography, slugify).
+
+    python -m benchmarks.bench_import --budget-ms 2500 --top 15
+
+Conviene correrlo varias veces (`--runs`): se toma la mediana. El presupuesto
+por defecto deja margen sobre lo medido (1.1-1.4s) para no fallar por ruido;
+tests/test_import.py revisa solo los módulos diferidos, que no dependen de la
+máquina.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Solo se usan en la migración, al hashear o al firmar/verificar tokens
+LAZY_MODULES = (
+    "alembic",
+    "passlib.context",
+    "jose.jwt",
+    "cryptography.hazmat.primitives.serialization",
+    "slugify",
+)
+
+# Valores mínimos para que settings valide; no pisan los que ya estén definidos
+IMPORT_ENV = {
+    "SECRET_KEY": "import-budget-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+}
+
+IMPORTTIME_LINE = re.compile(
+    r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<name>.*)$"
+)
+
+
+def measure_import(module: str = "main") -> dict[str, int]:
+    """Microsegundos acumulados por módulo importado al hacer `import module`."""
+    env = {**IMPORT_ENV, **os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            timings[match["name"].strip()] = int(match["cumulative"])
+    return timings
+
+
+def eager_modules(timings: dict[str, int]) -> list[str]:
+    """Módulos de LAZY_MODULES que se cargaron al importar."""
+    return [name for name in LAZY_MODULES if name in timings]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=2500)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    total_ms = statistics.median(run[args.module] for run in runs) / 1000
+    # Se listan solo los paquetes de primer nivel y los módulos de la app
+    timings = runs[-1]
+    top_level = {
+        name: value
+        for name, value in timings.items()
+        if "." not in name or name.startswith("app.")
+    }
+    for name, value in sorted(top_level.items(), key=lambda x: -x[1])[: args.top]:
+        print(f"{name:<50}{value / 1000:>10.1f}ms")
+
+    eager = eager_modules(timings)
+    print(f"\nimport {args.module}: {total_ms:.1f}ms (budget {args.budget_ms:.0f}ms)")
+    if eager:
+        print(f"loaded at import time, should be lazy: {', '.join(eager)}")
+    return 1 if total_ms > args.budget_ms or eager else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
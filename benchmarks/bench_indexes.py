@@ -0,0 +1,123 @@
+"""
+Latencia de la búsqueda de usuario (auth) y del listado de posts por categoría
+antes y después de la migración 0002_lookup_indexes.
+
+    python -m benchmarks.bench_indexes --users 50000 --posts 200000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.core import DBCategory, DBPost, DBUser
+from app.db.migrate import upgrade_db
+from app.models.category_model import read_db_posts_for_category
+from app.models.token_model import get_user
+
+
+def seed(session, users: int, categories: int, posts: int) -> None:
+    session.execute(
+        insert(DBUser),
+        [
+            {
+                "username": f"user{i}",
+                "full_name": f"User {i}",
+                "email": f"user{i}@example.com",
+                "hashed_password": "x",
+                "is_disabled": False,
+            }
+            for i in range(users)
+        ],
+    )
+    session.execute(
+        insert(DBCategory),
+        [
+            {"name": f"Category {i}", "slug": f"category-{i}"}
+            for i in range(categories)
+        ],
+    )
+    session.execute(
+        insert(DBPost),
+        [
+            {
+                "name": f"Post {i}",
+                "slug": f"post-{i}",
+                "description": "lorem ipsum",
+                "author_id": random.randint(1, users),
+                "category_id": random.randint(1, categories),
+            }
+            for i in range(posts)
+        ],
+    )
+    session.commit()
+
+
+def timed(fn, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p99_ms": samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def measure(session, users: int, categories: int, iterations: int) -> dict:
+    return {
+        "get_user": timed(
+            lambda: get_user(session, f"user{random.randrange(users)}"), iterations
+        ),
+        "posts_by_category": timed(
+            lambda: read_db_posts_for_category(
+                random.randint(1, categories), session
+            ),
+            iterations,
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--categories", type=int, default=500)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        session = sessionmaker(bind=engine)()
+        upgrade_db("0001_initial", bind=engine)
+        seed(session, args.users, args.categories, args.posts)
+
+        before = measure(session, args.users, args.categories, args.iterations)
+        session.close()
+        upgrade_db("head", bind=engine)
+        session = sessionmaker(bind=engine)()
+        after = measure(session, args.users, args.categories, args.iterations)
+        session.close()
+        engine.dispose()
+
+    columns = ("before p50", "after p50", "before p99", "after p99")
+    print(f"{'query':<20}" + "".join(f"{column:>12}" for column in columns))
+    for name in before:
+        print(
+            f"{name:<20}"
+            f"{before[name]['median_ms']:>10.3f}ms"
+            f"{after[name]['median_ms']:>10.3f}ms"
+            f"{before[name]['p99_ms']:>10.3f}ms"
+            f"{after[name]['p99_ms']:>10.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+CPU por respuesta de un listado de posts: el camino anterior
+(`Post(**db_post.__dict__)` + validación de FastAPI contra response_model +
+JSONResponse) contra `page_response` (una validación from_attributes + orjson).
+
+    python -m benchmarks.bench_serialization --rows 100 --iterations 2000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.db.core import DBPost
+from app.models.page_model import Page, page_response
+from app.models.post_model import Post
+
+
+def make_posts(rows: int) -> list[DBPost]:
+    now = datetime.now()
+    return [
+        DBPost(
+            id=i,
+            name=f"Post {i}",
+            slug=f"post-{i}",
+            description="lorem ipsum dolor sit amet",
+            author_id=1 + i % 50,
+            category_id=1 + i % 10,
+            created_at=now,
+            updated_at=None,
+        )
+        for i in range(1, rows + 1)
+    ]
+
+
+async def render_dict_copy(field, db_posts) -> bytes:
+    page = Page(items=[Post(**db_post.__dict__) for db_post in db_posts])
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body
+
+
+async def render_page_response(field, db_posts) -> bytes:
+    return page_response(Post, db_posts, None).body
+
+
+async def timed(render, field, db_posts, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await render(field, db_posts)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p99_ms": samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+async def measure(rows: int, iterations: int) -> dict:
+    db_posts = make_posts(rows)
+    field = create_response_field(name="response", type_=Page[Post])
+    # Las dos variantes deben producir el mismo JSON
+    assert json.loads(await render_dict_copy(field, db_posts)) == json.loads(
+        await render_page_response(field, db_posts)
+    )
+    return {
+        "__dict__ + response_model": await timed(
+            render_dict_copy, field, db_posts, iterations
+        ),
+        "page_response (orjson)": await timed(
+            render_page_response, field, db_posts, iterations
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = asyncio.run(measure(args.rows, args.iterations))
+    print(f"{'path':<28}{'p50':>12}{'p99':>12}")
+    for name, result in results.items():
+        print(
+            f"{name:<28}"
+            f"{result['median_ms']:>10.3f}ms"
+            f"{result['p99_ms']:>10.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Carga en proceso contra la app de main.py por ASGI (httpx.ASGITransport), sin
+red ni servidor: mide el costo de la app completa (middleware, dependencias,
+base de datos y serialización) de forma reproducible en una sola máquina.
+"""
+import asyncio
+import itertools
+import random
+import time
+
+import httpx
+
+from benchmarks.results import summarize
+from benchmarks.seed import BENCH_PASSWORD, SeedConfig, seed_database
+
+LOGIN_USERS = 20
+
+
+def scenarios(config: SeedConfig, tokens: list[str], rng: random.Random) -> dict:
+    return {
+        "POST /token/": lambda i: (
+            "POST",
+            "/token/",
+            {
+                "data": {
+                    "username": f"user{i % config.users}",
+                    "password": BENCH_PASSWORD,
+                }
+            },
+        ),
+        "GET /users/me/": lambda i: (
+            "GET",
+            "/users/me/",
+            {"headers": {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}},
+        ),
+        "GET /tags/{id}": lambda i: (
+            "GET",
+            f"/tags/{rng.randint(1, config.tags)}",
+            {},
+        ),
+        "GET /posts/": lambda i: (
+            "GET",
+            "/posts/",
+            {"params": {"category_id": rng.randint(1, config.categories)}},
+        ),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, make_request, requests: int, concurrency: int
+) -> dict:
+    counter = itertools.count()
+    samples: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            method, url, kwargs = make_request(i)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = summarize(samples, time.perf_counter() - start)
+    summary["errors"] = errors
+    summary["concurrency"] = concurrency
+    return summary
+
+
+async def run_load(
+    config: SeedConfig, requests: int, login_requests: int, concurrency: int
+) -> dict:
+    from app.db.core import session_local
+    from main import app
+
+    rng = random.Random(config.seed)
+    async with app.router.lifespan_context(app):
+        with session_local() as session:
+            seed_database(session, config)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            logins = await asyncio.gather(
+                *(
+                    client.post(
+                        "/token/",
+                        data={"username": f"user{i}", "password": BENCH_PASSWORD},
+                    )
+                    for i in range(min(LOGIN_USERS, config.users))
+                )
+            )
+            tokens = [response.json()["access_token"] for response in logins]
+
+            results = {}
+            for name, make_request in scenarios(config, tokens, rng).items():
+                total = login_requests if name == "POST /token/" else requests
+                # Calentamiento: caches, pool de conexiones y sentencias compiladas
+                await run_scenario(client, make_request, concurrency, concurrency)
+                results[name] = await run_scenario(
+                    client, make_request, total, concurrency
+                )
+    return results
@@ -0,0 +1,56 @@
+"""
+Micro-benchmarks de las operaciones que dominan el costo de un request:
+firma y verificación de JWT, verificación de contraseña y serialización de
+una página de posts.
+"""
+import time
+from datetime import timedelta
+
+from benchmarks.results import summarize
+from benchmarks.seed import BENCH_PASSWORD
+
+
+def timed(fn, iterations: int, warmup: int = 10) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def run_micro(iterations: int) -> dict:
+    from app.models.page_model import page_response
+    from app.models.post_model import Post
+    from app.models.token_model import create_access_token, decode_token
+    from app.routers.tokens.hasher import Hasher
+    from benchmarks.bench_serialization import make_posts
+
+    claims = {
+        "sub": "user0",
+        "uid": 1,
+        "disabled": False,
+        "roles": ["author"],
+        "scope": "posts:write",
+    }
+    token = create_access_token(claims, expires_delta=timedelta(minutes=30))
+    hashed_password = Hasher.get_password_hash(BENCH_PASSWORD)
+    db_posts = make_posts(100)
+    # Un hash cuesta cientos de ms: se hacen menos iteraciones
+    hash_iterations = max(5, iterations // 100)
+    return {
+        "jwt_encode": timed(
+            lambda: create_access_token(claims, timedelta(minutes=30)), iterations
+        ),
+        "jwt_decode": timed(lambda: decode_token(token), iterations),
+        "password_verify": timed(
+            lambda: Hasher.verify_password(BENCH_PASSWORD, hashed_password),
+            hash_iterations,
+            warmup=1,
+        ),
+        "serialize_page_100": timed(
+            lambda: page_response(Post, db_posts, None).body, iterations
+        ),
+    }
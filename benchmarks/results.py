@@ -0,0 +1,89 @@
+"""
+Resumen estadístico, metadatos del entorno y comparación de resultados JSON.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Métricas que se comparan y si más alto es mejor
+COMPARED_METRICS = {"p50_ms": False, "p99_ms": False, "rps": True}
+
+
+def summarize(samples_ms: list[float], elapsed_s: float | None = None) -> dict:
+    samples = sorted(samples_ms)
+    summary = {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": statistics.median(samples),
+        "p90_ms": samples[max(0, int(len(samples) * 0.90) - 1)],
+        "p99_ms": samples[max(0, int(len(samples) * 0.99) - 1)],
+        "max_ms": samples[-1],
+    }
+    if elapsed_s:
+        summary["rps"] = len(samples) / elapsed_s
+    return summary
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parents[1],
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(path: str, results: dict) -> None:
+    Path(path).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def load_results(path: str) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[dict]:
+    """
+    Compara cada benchmark presente en ambos archivos. Un cambio peor que
+    `threshold` (fracción, 0.1 = 10 %) en cualquier métrica es una regresión.
+    """
+    rows = []
+    for section in ("micro", "load"):
+        for name, before in baseline.get(section, {}).items():
+            after = current.get(section, {}).get(name)
+            if after is None:
+                continue
+            for metric, higher_is_better in COMPARED_METRICS.items():
+                if metric not in before or metric not in after or not before[metric]:
+                    continue
+                change = (after[metric] - before[metric]) / before[metric]
+                worse = -change if higher_is_better else change
+                rows.append(
+                    {
+                        "name": f"{section}:{name}",
+                        "metric": metric,
+                        "baseline": before[metric],
+                        "current": after[metric],
+                        "change": change,
+                        "regression": worse > threshold,
+                    }
+                )
+    return rows
@@ -0,0 +1,97 @@
+"""
+Generador de datos para benchmarks: usuarios, categorías, etiquetas y posts
+con etiquetas, siempre iguales para la misma semilla.
+"""
+import random
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db.core import DBCategory, DBPost, DBPostTag, DBTag, DBUser
+from app.models.bulk_model import chunked
+from app.routers.tokens.hasher import Hasher
+
+BENCH_PASSWORD = "bench-password"
+MAX_TAGS_PER_POST = 3
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    users: int = 1000
+    categories: int = 50
+    tags: int = 200
+    posts: int = 10000
+    seed: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def seed_database(session: Session, config: SeedConfig = SeedConfig()) -> None:
+    rng = random.Random(config.seed)
+    # Un solo hash para todos: con bcrypt a costo real serían minutos de seed
+    hashed_password = Hasher.get_password_hash(BENCH_PASSWORD)
+    batches = [
+        (
+            DBUser,
+            [
+                {
+                    "username": f"user{i}",
+                    "full_name": f"User {i}",
+                    "email": f"user{i}@example.com",
+                    "hashed_password": hashed_password,
+                    "is_disabled": False,
+                }
+                for i in range(config.users)
+            ],
+        ),
+        (
+            DBCategory,
+            [
+                {"name": f"Category {i}", "slug": f"category-{i}"}
+                for i in range(config.categories)
+            ],
+        ),
+        (
+            DBTag,
+            [{"name": f"Tag {i}", "slug": f"tag-{i}"} for i in range(config.tags)],
+        ),
+        (
+            DBPost,
+            [
+                {
+                    "name": f"Post {i}",
+                    "slug": f"post-{i}",
+                    "description": " ".join(
+                        rng.choice(WORDS) for _ in range(rng.randint(8, 40))
+                    ),
+                    "author_id": rng.randint(1, config.users),
+                    "category_id": rng.randint(1, config.categories),
+                }
+                for i in range(config.posts)
+            ],
+        ),
+        (
+            DBPostTag,
+            [
+                {"post_id": post_id, "tag_id": tag_id}
+                for post_id in range(1, config.posts + 1)
+                for tag_id in rng.sample(
+                    range(1, config.tags + 1),
+                    rng.randint(0, min(MAX_TAGS_PER_POST, config.tags)),
+                )
+            ],
+        ),
+    ]
+    for model, rows in batches:
+        for chunk in chunked(rows, 5000):
+            session.execute(insert(model), chunk)
+    session.commit()
+
+
+WORDS = (
+    "python fastapi sqlalchemy async await token bearer cache index query "
+    "latency throughput worker pool thread event loop bcrypt argon2 jwt "
+    "category tag post author slug search export stream page cursor keyset"
+).split()
@@ -1,14 +1,51 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
+from app.db.core import dispose_engines, init_engines
+from app.db.migrate import upgrade_db
+from app.routers.metrics.instrumentation import MetricsMiddleware, RequestContextMiddleware
+from app.routers.metrics.profiling import ProfilingMiddleware
+from app.routers.tokens.env_settings import settings
+from app.routers.tokens.hasher import Hasher
+from app.routers.tokens.scopes import permission_map
+from app.routers.tokens.user_state import disabled_users
+from app.warmup import warm_up
+
 from app.routers.users.user_router import router as user_router
 from app.routers.tokens.token_router import router as token_router
+from app.routers.tokens.jwks_router import router as jwks_router
+from app.routers.metrics.metrics_router import router as metrics_router
 from app.routers.posts.post_router import router as post_router
 from app.routers.categories.category_router import router as category_router
 from app.routers.tags.tag_router import router as tag_router
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_engines()
+    if settings.DB_MIGRATE_ON_STARTUP:
+        upgrade_db()
+    # Después de migrar: los roles por defecto los crea una migración
+    await permission_map.reload()
+    await disabled_users.load()
+    Hasher.calibrate()
+    if settings.WARMUP_ON_STARTUP:
+        await warm_up()
+    yield
+    await dispose_engines()
+
+
+app = FastAPI(lifespan=lifespan)
+if settings.PROFILE_HEADER or settings.PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+elif settings.SLOW_QUERY_MS > 0:
+    # Sin métricas igual hace falta la ruta en el log de consultas lentas
+    app.add_middleware(RequestContextMiddleware)
 app.include_router(token_router)
+app.include_router(jwks_router, tags=["Tokens"])
 app.include_router(user_router, tags=["Users"])
 app.include_router(post_router, tags=["Posts"])
 app.include_router(category_router, tags=["Categories"])
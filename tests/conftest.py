@@ -0,0 +1,51 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# settings y los engines se crean al importar la app: el entorno va antes
+TEST_DIR = tempfile.mkdtemp(prefix="app-tests-")
+os.environ.update(
+    {
+        "SECRET_KEY": "test-secret-key",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+        "DATABASE_URL": f"sqlite:///{Path(TEST_DIR) / 'test.db'}",
+        "BCRYPT_ROUNDS": "4",
+        "WARMUP_ON_STARTUP": "false",
+        "PROFILE_DIR": str(Path(TEST_DIR) / "profiles"),
+    }
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.db.core import session_local  # noqa: E402
+from app.models.user_model import set_db_user_role  # noqa: E402
+from main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def editor_headers(client) -> dict[str, str]:
+    """Token de un usuario con el rol editor (escribe posts, tags y categorías)."""
+    client.post(
+        "/users/create",
+        json={
+            "username": "editor",
+            "email": "editor@example.com",
+            "full_name": "Editor",
+            "hashed_password": "editor-password",
+        },
+    )
+    with session_local() as session:
+        set_db_user_role("editor", "editor", session)
+    token = client.post(
+        "/token/", data={"username": "editor", "password": "editor-password"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+from app.db.cache import MemoryCacheBackend, ReadThroughCache
+
+
+class Item(BaseModel):
+    name: str
+
+
+def test_load_racing_an_invalidation_is_not_cached():
+    cache = ReadThroughCache(MemoryCacheBackend(max_size=10), ttl=60)
+
+    def stale_loader() -> Item:
+        # Una escritura termina mientras esta carga todavía tiene la fila vieja
+        cache.invalidate("item:1")
+        return Item(name="old")
+
+    assert cache.get_or_load("item:1", stale_loader).body == b'{"name":"old"}'
+    fresh = cache.get_or_load("item:1", lambda: Item(name="new"))
+    assert fresh.body == b'{"name":"new"}'
+    assert cache.get_or_load("item:1", lambda: Item(name="unused")).body == fresh.body
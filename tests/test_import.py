@@ -0,0 +1,8 @@
+from benchmarks.bench_import import eager_modules, measure_import
+
+
+def test_import_keeps_heavy_modules_lazy():
+    # Sin presupuesto de tiempo: depende de la máquina (ver bench_import)
+    timings = measure_import("main")
+    assert "main" in timings
+    assert eager_modules(timings) == []
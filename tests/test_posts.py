@@ -0,0 +1,36 @@
+import time
+from datetime import datetime
+
+
+def create_post(client, headers, category_id: int, name: str) -> dict:
+    response = client.post(
+        "/posts/",
+        params={"category_id": category_id},
+        json={"name": name, "description": f"{name} body", "tag_ids": []},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_created_filters_split_posts_by_timestamp(client, editor_headers):
+    category = client.post(
+        "/categories/", json={"name": "Timestamps"}, headers=editor_headers
+    ).json()
+    older = create_post(client, editor_headers, category["id"], "Older post")
+    time.sleep(0.01)
+    between = datetime.now()
+    time.sleep(0.01)
+    newer = create_post(client, editor_headers, category["id"], "Newer post")
+    # Cada fila toma su propio created_at (no el de cuando se importó el modelo)
+    assert older["created_at"] < newer["created_at"]
+
+    def ids(**filters) -> list[int]:
+        params = {"category_id": category["id"], **filters}
+        response = client.get("/posts/", params=params)
+        assert response.status_code == 200, response.text
+        return [post["id"] for post in response.json()["items"]]
+
+    assert ids(created_before=between.isoformat()) == [older["id"]]
+    assert ids(created_after=between.isoformat()) == [newer["id"]]
+    assert ids() == [older["id"], newer["id"]]
@@ -0,0 +1,24 @@
+def test_search_escapes_user_text_and_sentinels(client, editor_headers):
+    category = client.post(
+        "/categories/", json={"name": "Search"}, headers=editor_headers
+    ).json()
+    response = client.post(
+        "/posts/",
+        params={"category_id": category["id"]},
+        json={
+            "name": "Markup zebra",
+            "description": "<b>zebra</b> \ue000injected\ue001 <script>",
+            "tag_ids": [],
+        },
+        headers=editor_headers,
+    )
+    assert response.status_code == 200, response.text
+    assert "\ue000" not in response.json()["description"]
+
+    results = client.get("/posts/search", params={"q": "zebra"}).json()
+    [result] = [post for post in results if post["id"] == response.json()["id"]]
+    snippet = result["description_snippet"]
+    # Solo la coincidencia queda marcada; el resto del texto va escapado
+    assert snippet.count("<mark>") == 1
+    assert "&lt;b&gt;<mark>zebra</mark>&lt;/b&gt;" in snippet
+    assert "&lt;script&gt;" in snippet
@@ -0,0 +1,14 @@
+def test_tag_write_routes_return_the_item(client, editor_headers):
+    created = client.post("/tags/", json={"name": "Orjson"}, headers=editor_headers)
+    assert created.status_code == 200, created.text
+    tag = created.json()
+    assert tag["name"] == "Orjson" and tag["slug"] == "orjson"
+
+    updated = client.put(
+        f"/tags/{tag['id']}", json={"name": "Orjson 2"}, headers=editor_headers
+    )
+    assert updated.json()["name"] == "Orjson 2"
+    assert client.get(f"/tags/{tag['id']}").json() == updated.json()
+
+    deleted = client.delete(f"/tags/{tag['id']}", headers=editor_headers)
+    assert deleted.json()["id"] == tag["id"]